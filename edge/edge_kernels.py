@@ -0,0 +1,158 @@
+"""
+Edge Processing Kernels for Inscenium
+=====================================
+
+Compiled per-frame kernels for the lightweight edge pipeline. Each kernel
+works on the resized uint8 frame and writes into caller-allocated buffers so
+the worker threads only build Python dicts once, after the kernel returns.
+Random draws for the mock models come from the caller's per-worker
+np.random.Generator, filled into one buffer per frame.
+
+Frames enter the kernels as uint8 and are never upcast; a real model swapped
+in here should take a quantized (int8) input as well.
+
+Kernels are compiled with Numba (nogil) when it is available and fall back to
+plain Python otherwise.
+"""
+
+import functools
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    logger.warning("numba not available, edge kernels run in pure Python")
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        def wrap(fn):
+            return fn
+        return wrap
+
+# Compiled kernels drop the GIL, so the processor's worker threads overlap
+RELEASES_GIL = HAS_NUMBA
+
+# Explicit signatures compile eagerly at import, so every worker shares the
+# same machine code and no frame pays for type inference
+jit = functools.partial(njit, nogil=True, cache=True)
+
+MAX_SURFACES = 8
+SURFACE_TYPES = ("wall", "table", "screen")
+OPPORTUNITY_MIN_CONFIDENCE = 0.6
+
+# Slots of the scalar output buffer
+OUT_NUM_SURFACES = 0
+OUT_DEPTH_CONFIDENCE = 1
+OUT_QUALITY_SCORE = 2
+NUM_SCALARS = 3
+
+# Depth stays integer millimetres inside the pipeline
+DEPTH_MIN_MM = 1000
+DEPTH_MAX_MM = 8000
+DEPTH_MEAN = 0
+NUM_DEPTH = 1
+
+# Layout of the per-frame uniform draws buffer, filled by the caller's RNG
+DRAWS_PER_SURFACE = 6
+DRAW_NUM_SURFACES = 0
+DRAW_SURFACES = 1
+DRAW_DEPTH = DRAW_SURFACES + MAX_SURFACES * DRAWS_PER_SURFACE
+DRAW_QUALITY = DRAW_DEPTH + 2
+NUM_DRAWS = DRAW_QUALITY + 1
+
+
+@jit("int64(float32, int64, int64)")
+def uniform_int(u, low, high):
+    """Map a uniform [0, 1) draw onto the integer range [low, high)"""
+    return min(low + int(u * (high - low)), high - 1)
+
+
+@jit("int64(uint8[:,:,::1], float32[:], int32[:,::1], float32[:], uint8[:])")
+def detect_surfaces_light(frame, draws, bboxes, confidences, types):
+    """Lightweight surface detection, returns the number of surfaces written"""
+    h = frame.shape[0]
+    w = frame.shape[1]
+    n = uniform_int(draws[DRAW_NUM_SURFACES], 0, 3)  # 0-2 surfaces
+
+    for i in range(n):
+        d = DRAW_SURFACES + i * DRAWS_PER_SURFACE
+        x = uniform_int(draws[d], 0, max(w // 2, 1))
+        y = uniform_int(draws[d + 1], 0, max(h // 2, 1))
+        width = uniform_int(draws[d + 2], 50, max(w // 3, 51))
+        height = uniform_int(draws[d + 3], 30, max(h // 3, 31))
+
+        bboxes[i, 0] = x
+        bboxes[i, 1] = y
+        bboxes[i, 2] = x + width
+        bboxes[i, 3] = y + height
+        confidences[i] = 0.7 + draws[d + 4] * 0.2
+        types[i] = uniform_int(draws[d + 5], 0, 3)
+
+    return n
+
+
+@jit("void(uint8[:,:,::1], float32[:], uint16[:], float32[:])")
+def estimate_depth_light(frame, draws, depth_mm, scalars):
+    """Lightweight depth estimation, writes depth in millimetres"""
+    depth_mm[DEPTH_MEAN] = 3500 + uniform_int(draws[DRAW_DEPTH], 0, 2000)
+    scalars[OUT_DEPTH_CONFIDENCE] = 0.6 + draws[DRAW_DEPTH + 1] * 0.2
+
+
+@jit("float32(uint8[:,:,::1], float32[:], int64)")
+def check_quality_light(frame, draws, num_surfaces):
+    """Lightweight quality assessment"""
+    base_quality = 60 + draws[DRAW_QUALITY] * 30
+
+    # Bonus for detected surfaces
+    surface_bonus = num_surfaces * 5
+
+    return min(100.0, base_quality + surface_bonus)
+
+
+@jit("int64(uint8[:,:,::1], float32[:], int32[:,::1], float32[:], uint8[:], uint16[:], float32[:])")
+def run_pipeline(frame, draws, bboxes, confidences, types, depth_mm, scalars):
+    """Run the full light pipeline on one frame, returns the number of surfaces"""
+    n = detect_surfaces_light(frame, draws, bboxes, confidences, types)
+    estimate_depth_light(frame, draws, depth_mm, scalars)
+    quality = check_quality_light(frame, draws, n)
+
+    scalars[OUT_NUM_SURFACES] = n
+    scalars[OUT_QUALITY_SCORE] = quality
+    return n
+
+
+# Plain loop rather than prange: worker threads already run batches in parallel
+@jit("void(uint8[:,:,:,::1], float32[:,::1], int32[:,:,::1], float32[:,::1], uint8[:,::1], "
+     "uint16[:,::1], float32[:,::1], int64[::1])")
+def run_pipeline_batch(frames, draws, bboxes, confidences, types, depth_mm, scalars, counts):
+    """Run the light pipeline over a (B, H, W, 3) batch, one surface count per frame"""
+    for b in range(frames.shape[0]):
+        counts[b] = run_pipeline(
+            frames[b], draws[b], bboxes[b], confidences[b], types[b], depth_mm[b], scalars[b]
+        )
+
+
+def allocate_buffers(batch_size: int = 1):
+    """Allocate the output buffers consumed by run_pipeline_batch"""
+    return {
+        "draws": np.empty((batch_size, NUM_DRAWS), np.float32),
+        "bboxes": np.empty((batch_size, MAX_SURFACES, 4), np.int32),
+        "confidences": np.empty((batch_size, MAX_SURFACES), np.float32),
+        "types": np.empty((batch_size, MAX_SURFACES), np.uint8),
+        "depth_mm": np.zeros((batch_size, NUM_DEPTH), np.uint16),
+        "scalars": np.zeros((batch_size, NUM_SCALARS), np.float32),
+        "counts": np.zeros(batch_size, np.int64),
+    }
+
+
+# Prefer the ahead-of-time build (see edge_kernels_aot) when it has been shipped
+try:
+    from ._edge_kernels_aot import run_pipeline, run_pipeline_batch  # noqa: F811
+    HAS_AOT = True
+except ImportError:
+    HAS_AOT = False
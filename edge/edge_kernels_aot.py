@@ -0,0 +1,41 @@
+"""
+Ahead-of-Time Edge Kernels
+==========================
+
+Builds the edge pipeline kernels into a native extension so deployed devices
+do not pay JIT compile time on their first frame after a cold start.
+
+Run once per target platform when packaging:
+
+    python -m edge.edge_kernels_aot
+
+This writes ``_edge_kernels_aot`` next to this file. ``edge_kernels`` picks it
+up automatically and falls back to the cached JIT kernels when it is absent.
+"""
+
+import logging
+from pathlib import Path
+
+from numba.pycc import CC
+
+from . import edge_kernels
+
+logger = logging.getLogger(__name__)
+
+cc = CC("_edge_kernels_aot")
+cc.output_dir = str(Path(__file__).parent)
+
+cc.export(
+    "run_pipeline",
+    "int64(uint8[:,:,::1], float32[:], int32[:,::1], float32[:], uint8[:], uint16[:], float32[:])"
+)(edge_kernels.run_pipeline.py_func)
+cc.export(
+    "run_pipeline_batch",
+    "void(uint8[:,:,:,::1], float32[:,::1], int32[:,:,::1], float32[:,::1], uint8[:,::1], "
+    "uint16[:,::1], float32[:,::1], int64[::1])"
+)(edge_kernels.run_pipeline_batch.py_func)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    cc.compile()
+    logger.info(f"Built {cc.name} in {cc.output_dir}")
@@ -6,18 +6,41 @@ Real-time processing capabilities for edge deployment scenarios,
 including lightweight models and optimized inference.
 """
 
+import functools
+import itertools
 import logging
+import os
 import time
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
+from collections import OrderedDict, deque
+from collections.abc import Sequence
 import threading
 from queue import Queue, Empty
-import cv2
 
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=None)
+def _cv2():
+    """Import and configure OpenCV on first use, keeps module import cheap"""
+    import cv2
+    
+    # SIMD resize kernels, leave half the cores to the processing workers
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+    return cv2
+
+# Frame dtype accepted at ingress, every kernel is written for uint8
+FRAME_DTYPE = np.uint8
+
+@functools.lru_cache(maxsize=None)
+def _kernels():
+    """Import the edge kernels on first use, Numba compiles them at import"""
+    from . import edge_kernels
+    return edge_kernels
+
 @dataclass
 class EdgeConfig:
     """Configuration for edge processing"""
@@ -28,11 +51,14 @@ class EdgeConfig:
     memory_limit_mb: int = 512
     use_gpu_acceleration: bool = True
     enable_caching: bool = True
+    cache_hamming_threshold: int = 5  # Max differing pHash bits for a cache hit
+    cache_max_entries: int = 8
+    opportunity_nms_iou: float = 0.5  # Max IoU between emitted opportunities
     processing_threads: int = 2
 
-@dataclass
+@dataclass(frozen=True)
 class ProcessingStats:
-    """Processing performance statistics"""
+    """Processing performance statistics (immutable snapshot)"""
     frames_processed: int = 0
     processing_time_ms: float = 0.0
     avg_fps: float = 0.0
@@ -41,6 +67,96 @@ class ProcessingStats:
     gpu_usage_percent: float = 0.0
     queue_depth: int = 0
     errors: int = 0
+    copies: int = 0  # Non-contiguous input frames copied at ingress
+    dropped_stale: int = 0  # Queued frames dropped in favour of newer ones
+    latency_p50_ms: float = 0.0
+    latency_p95_ms: float = 0.0
+    latency_p99_ms: float = 0.0
+
+@dataclass
+class FrameSlot:
+    """Reusable per-frame record shared by producer, workers and consumer"""
+    frame: Optional[np.ndarray] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    timestamp_ns: int = 0
+    frame_id: int = -1
+    results: Dict[str, Any] = field(default_factory=dict)
+    success: bool = False
+    cached: bool = False
+    error: Optional[str] = None
+    processing_time_ms: float = 0.0
+    worker_id: str = ""
+
+class SurfaceSet(Sequence):
+    """Detected surfaces stored as parallel arrays, dicts built on access"""
+    
+    def __init__(self, bboxes: np.ndarray, confidences: np.ndarray, types: np.ndarray):
+        self.bboxes = bboxes
+        self.confidences = confidences
+        self.types = types
+    
+    def __len__(self) -> int:
+        return len(self.confidences)
+    
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        x0, y0, x1, y1 = (int(v) for v in self.bboxes[i])
+        return {
+            "surface_id": f"edge_surf_{i:03d}",
+            "bbox": [x0, y0, x1, y1],
+            "confidence": float(self.confidences[i]),
+            "surface_type": _kernels().SURFACE_TYPES[self.types[i]],
+            "area_pixels": (x1 - x0) * (y1 - y0)
+        }
+
+class OpportunitySet(Sequence):
+    """Placement opportunities stored as parallel arrays, dicts built on access"""
+    
+    def __init__(self, surface_indices: np.ndarray, bboxes: np.ndarray,
+                 confidences: np.ndarray, types: np.ndarray, prs_scores: np.ndarray):
+        self.surface_indices = surface_indices
+        self.bboxes = bboxes
+        self.confidences = confidences
+        self.types = types
+        self.prs_scores = prs_scores
+    
+    def __len__(self) -> int:
+        return len(self.prs_scores)
+    
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return {
+            "opportunity_id": f"edge_opp_{i:03d}",
+            "surface_id": f"edge_surf_{int(self.surface_indices[i]):03d}",
+            "prs_score": float(self.prs_scores[i]),
+            "placement_type": _kernels().SURFACE_TYPES[self.types[i]],
+            "bbox": [int(v) for v in self.bboxes[i]],
+            "confidence": float(self.confidences[i]),
+            "edge_processed": True
+        }
+
+# Worker latency histogram: 0.5ms buckets, the last one catches >= 127.5ms
+LATENCY_BUCKET_NS = 500_000
+LATENCY_BUCKETS = 256
+
+# Bit offsets of x0, y0, x1, y1 inside a packed bbox
+_BBOX_SHIFTS = np.array([48, 32, 16, 0], dtype=np.uint64)
+_BBOX_MASK = np.uint64(0xFFFF)
+
+def pack_bboxes(bboxes: np.ndarray) -> np.ndarray:
+    """Pack (N, 4) [x0, y0, x1, y1] boxes into one uint64 each, 16 bits per field"""
+    fields = bboxes.astype(np.uint64) & _BBOX_MASK
+    return np.bitwise_or.reduce(fields << _BBOX_SHIFTS, axis=1)
+
+def packed_bbox_iou(packed: np.ndarray) -> np.ndarray:
+    """Pairwise (N, N) IoU of packed boxes, computed on whole arrays"""
+    fields = ((packed[:, None] >> _BBOX_SHIFTS) & _BBOX_MASK).astype(np.int64)
+    x0, y0, x1, y1 = fields.T
+    
+    inter_w = np.clip(np.minimum(x1[:, None], x1) - np.maximum(x0[:, None], x0), 0, None)
+    inter_h = np.clip(np.minimum(y1[:, None], y1) - np.maximum(y0[:, None], y0), 0, None)
+    inter = inter_w * inter_h
+    area = (x1 - x0) * (y1 - y0)
+    union = area[:, None] + area - inter
+    return inter / np.maximum(union, 1)
 
 class EdgeProcessor:
     """Optimized edge processing for real-time Inscenium pipeline"""
@@ -48,20 +164,46 @@ class EdgeProcessor:
     def __init__(self, config: Optional[EdgeConfig] = None):
         self.config = config or EdgeConfig()
         self.is_running = False
-        self.stats = ProcessingStats()
         
-        # Processing pipeline
-        self.input_queue = Queue(maxsize=10)
-        self.output_queue = Queue(maxsize=10) 
+        # Live stats, only touched under the lock and exposed as snapshots
+        self._stats = asdict(ProcessingStats())
+        self._stats_lock = threading.Lock()
+        self._frame_ids = itertools.count()
+        
+        # Processing pipeline: queues carry indices into a ring of frame slots
+        queue_size = 10
+        # Single producer / N workers: one condition instead of Queue's lock pair.
+        # Kept short: a full queue drops its oldest frame, bounding frame age
+        self.input_queue_size = max(2, self.config.batch_size)
+        self._input_deque = deque()
+        self._input_cv = threading.Condition()
+        self.output_queue = Queue(maxsize=queue_size)
+        self._slots = [FrameSlot() for _ in range(queue_size * 2)]
+        self._free_slots = Queue()
+        self._reset_slots()
         self.processing_threads = []
+        self._thread_local = threading.local()
+        
+        # GPU resize path (per-thread pinned staging buffers)
+        self._pinned_buffers = {}
+        self._resize_cache: Dict[Tuple[int, int], Tuple[int, int, List[Tuple[Tuple[int, int], int]]]] = {}
+        self._configure_resize_backend()
+        
+        # Near-duplicate frame cache: pHash signature -> results (LRU order)
+        self._result_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         # Model cache
         self.model_cache = {}
         self.last_cleanup = time.time()
         
         # Performance monitoring
-        self.frame_times = []
         self.max_frame_history = 100
+        self.frame_times = deque(maxlen=self.max_frame_history)  # monotonic ns
+        
+        # Per-worker latency histograms, folded by the monitoring thread
+        self._latency_hists: List[Dict[str, np.ndarray]] = []
+        self._latency_prev = (np.zeros(LATENCY_BUCKETS, np.int64), 0)
         
         logger.info(f"Initialized edge processor with config: {self.config}")
     
@@ -80,6 +222,12 @@ class EdgeProcessor:
             # Start processing threads
             self.is_running = True
             
+            if self.config.processing_threads > 1 and not _kernels().RELEASES_GIL:
+                logger.warning(
+                    f"Edge kernels hold the GIL without numba, "
+                    f"{self.config.processing_threads} workers will mostly serialize"
+                )
+            
             for i in range(self.config.processing_threads):
                 thread = threading.Thread(
                     target=self._processing_worker,
@@ -108,14 +256,18 @@ class EdgeProcessor:
         """Stop the edge processing pipeline"""
         try:
             self.is_running = False
+            with self._input_cv:
+                self._input_cv.notify_all()
             
             # Wait for threads to finish
             for thread in self.processing_threads:
                 thread.join(timeout=5.0)
             
             # Clear queues
-            self._clear_queue(self.input_queue)
+            with self._input_cv:
+                self._input_deque.clear()
             self._clear_queue(self.output_queue)
+            self._reset_slots()
             
             logger.info("Edge processing pipeline stopped")
             
@@ -138,33 +290,93 @@ class EdgeProcessor:
                 logger.warning("Edge processor not running")
                 return None
             
-            # Prepare frame data
-            frame_data = {
-                "frame": frame,
-                "metadata": metadata or {},
-                "timestamp": time.time(),
-                "frame_id": self.stats.frames_processed
-            }
+            if frame.dtype != FRAME_DTYPE:
+                logger.warning(f"Rejecting {frame.dtype} frame, edge pipeline expects {np.dtype(FRAME_DTYPE)}")
+                return {"status": "rejected", "reason": "dtype"}
+            
+            # Make frames contiguous once here so resize and kernels never copy
+            if not frame.flags["C_CONTIGUOUS"]:
+                frame = np.ascontiguousarray(frame)
+                self._bump_stat("copies")
+                logger.debug("Copied non-contiguous input frame")
             
-            # Add to input queue (non-blocking)
+            # Fill a free slot in place
             try:
-                self.input_queue.put(frame_data, timeout=0.1)
-                return {"status": "queued", "frame_id": frame_data["frame_id"]}
-            except:
-                logger.warning("Input queue full, dropping frame")
+                slot_idx = self._free_slots.get_nowait()
+            except Empty:
+                logger.warning("No free frame slots, dropping frame")
                 return {"status": "dropped", "reason": "queue_full"}
+            
+            slot = self._slots[slot_idx]
+            slot.frame = frame
+            slot.metadata = metadata or {}
+            slot.timestamp_ns = time.monotonic_ns()
+            slot.frame_id = next(self._frame_ids)
+            
+            # Add to input queue, dropping the oldest frame when full so
+            # workers always see the freshest frames
+            stale_idx = None
+            with self._input_cv:
+                if len(self._input_deque) >= self.input_queue_size:
+                    stale_idx = self._input_deque.popleft()
+                self._input_deque.append(slot_idx)
+                self._input_cv.notify()
+            
+            if stale_idx is not None:
+                self._release_slot(stale_idx)
+                self._bump_stat("dropped_stale")
+                
+                # Cached results may belong to the dropped frame's scene
+                with self._cache_lock:
+                    self._result_cache.clear()
+                logger.debug("Input queue full, dropped oldest frame")
+            
+            return {"status": "queued", "frame_id": slot.frame_id}
                 
         except Exception as e:
             logger.error(f"Frame processing failed: {e}")
-            self.stats.errors += 1
+            self._bump_stat("errors")
             return None
     
     def get_results(self, timeout: float = 0.1) -> Optional[Dict[str, Any]]:
         """Get processing results from output queue"""
         try:
-            return self.output_queue.get(timeout=timeout)
+            slot_idx = self.output_queue.get(timeout=timeout)
         except Empty:
             return None
+        
+        slot = self._slots[slot_idx]
+        result = {
+            "frame_id": slot.frame_id,
+            "timestamp": slot.timestamp_ns / 1e9,
+            "results": slot.results,
+            "success": slot.success,
+            "processing_time_ms": slot.processing_time_ms,
+            "worker_id": slot.worker_id
+        }
+        if slot.cached:
+            result["cached"] = True
+        if slot.error is not None:
+            result["error"] = slot.error
+        
+        self._release_slot(slot_idx)
+        return result
+    
+    def _release_slot(self, slot_idx: int):
+        """Drop a slot's references and return it to the free list"""
+        slot = self._slots[slot_idx]
+        slot.frame = None
+        slot.metadata = {}
+        slot.results = {}
+        slot.cached = False
+        slot.error = None
+        self._free_slots.put(slot_idx)
+    
+    def _reset_slots(self):
+        """Return every slot to the free list"""
+        self._clear_queue(self._free_slots)
+        for slot_idx in range(len(self._slots)):
+            self._release_slot(slot_idx)
     
     def _initialize_models(self) -> bool:
         """Initialize lightweight models for edge processing"""
@@ -183,11 +395,14 @@ class EdgeProcessor:
                 # Simulate model loading time
                 time.sleep(0.1)
                 
+                input_size = (256, 256)  # Smaller for edge
+                model = self._compile_model(f"mock_{model_name}", input_size)
+                
                 # Cache mock model
                 self.model_cache[model_name] = {
-                    "model": f"mock_{model_name}",
+                    "model": model,
                     "loaded_at": time.time(),
-                    "input_size": (256, 256),  # Smaller for edge
+                    "input_size": input_size,
                     "inference_time_ms": 15.0  # Optimized for speed
                 }
             
@@ -198,192 +413,362 @@ class EdgeProcessor:
             logger.error(f"Model initialization failed: {e}")
             return False
     
+    def _compile_model(self, model: Any, input_size: Tuple[int, int]) -> Any:
+        """torch.compile a real model and warm it up, mock models pass through"""
+        # Compile cost is not worth paying on fast/mobile CPU presets
+        if not (self.config.use_gpu_acceleration or self.config.quality_preset != "fast"):
+            return model
+        
+        try:
+            import torch
+        except ImportError:
+            return model
+        
+        if not isinstance(model, torch.nn.Module):
+            return model
+        
+        try:
+            device = "cuda" if self.config.use_gpu_acceleration and torch.cuda.is_available() else "cpu"
+            if device == "cuda":
+                torch.backends.cudnn.benchmark = True
+            
+            model = model.eval().to(device)
+            compiled = torch.compile(model, mode="reduce-overhead", fullgraph=True)
+            
+            # Trigger compilation now so the first real frame doesn't pay for it
+            dummy = torch.zeros(1, 3, *input_size, device=device)
+            with torch.inference_mode():
+                for _ in range(3):
+                    compiled(dummy)
+            
+            logger.info(f"Compiled edge model on {device}")
+            return compiled
+        except Exception as e:
+            logger.warning(f"torch.compile failed, using eager model: {e}")
+            return model
+    
     def _processing_worker(self):
         """Worker thread for processing frames"""
         thread_id = threading.current_thread().name
         logger.debug(f"Started processing worker: {thread_id}")
         
+        # Per-worker generator, avoids the lock on the global np.random state
+        self._thread_local.rng = np.random.default_rng()
+        
         while self.is_running:
             try:
-                # Get frame from input queue
-                frame_data = self.input_queue.get(timeout=1.0)
+                # Get up to batch_size frame slots from input queue
+                slot_indices = self._pop_inputs(timeout=1.0, max_items=self.config.batch_size)
+                if not slot_indices:
+                    continue
                 
-                # Process frame
-                start_time = time.time()
-                result = self._process_frame_internal(frame_data)
-                processing_time = (time.time() - start_time) * 1000
+                # Process batch, results are written into the slots
+                start_ns = time.monotonic_ns()
+                self._process_batch_internal([self._slots[i] for i in slot_indices])
+                end_ns = time.monotonic_ns()
+                processing_time_ns = (end_ns - start_ns) // len(slot_indices)
                 
-                # Add timing info
-                result["processing_time_ms"] = processing_time
-                result["worker_id"] = thread_id
+                for slot_idx in slot_indices:
+                    # Add timing info
+                    slot = self._slots[slot_idx]
+                    slot.processing_time_ms = processing_time_ns / 1e6
+                    slot.worker_id = thread_id
+                    
+                    # Put result in output queue
+                    try:
+                        self.output_queue.put(slot_idx, timeout=0.5)
+                    except:
+                        self._release_slot(slot_idx)
+                        logger.warning("Output queue full, dropping result")
+                    
+                    # Update stats
+                    self._bump_stat("frames_processed")
+                    self._update_performance_stats(processing_time_ns, end_ns)
                 
-                # Put result in output queue
-                try:
-                    self.output_queue.put(result, timeout=0.5)
-                except:
-                    logger.warning("Output queue full, dropping result")
+            except Exception as e:
+                logger.error(f"Worker {thread_id} error: {e}")
+                self._bump_stat("errors")
+    
+    def _process_batch_internal(self, slots: List[FrameSlot]):
+        """Internal batch processing logic, fills each slot's result fields"""
+        # Resized frames that missed the cache, grouped by shape for stacking
+        pending: Dict[Tuple[int, ...], List[Tuple[FrameSlot, np.ndarray, Optional[int]]]] = {}
+        
+        for slot in slots:
+            try:
+                # Resize frame for edge processing (contiguous in, contiguous out)
+                resized_frame = self._resize_for_edge(slot.frame)
                 
-                # Update stats
-                self.stats.frames_processed += 1
-                self._update_performance_stats(processing_time)
+                # Reuse results of a recent near-identical frame
+                signature = None
+                if self.config.enable_caching:
+                    signature = self._frame_signature(resized_frame)
+                    cached_results = self._lookup_cached_results(signature)
+                    if cached_results is not None:
+                        slot.results = cached_results
+                        slot.success = True
+                        slot.cached = True
+                        continue
+                
+                pending.setdefault(resized_frame.shape, []).append((slot, resized_frame, signature))
                 
-            except Empty:
-                continue
             except Exception as e:
-                logger.error(f"Worker {thread_id} error: {e}")
-                self.stats.errors += 1
+                self._fail_slot(slot, e)
+        
+        for group in pending.values():
+            try:
+                self._run_batch(group)
+            except Exception as e:
+                for slot, _, _ in group:
+                    self._fail_slot(slot, e)
     
-    def _process_frame_internal(self, frame_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Internal frame processing logic"""
-        try:
-            frame = frame_data["frame"]
-            frame_id = frame_data["frame_id"]
-            
-            # Resize frame for edge processing
-            resized_frame = self._resize_for_edge(frame)
-            
-            # Run lightweight pipeline
-            results = {}
-            
-            # 1. Surface detection (lightweight)
-            surfaces = self._detect_surfaces_light(resized_frame)
-            results["surfaces"] = surfaces
-            
-            # 2. Quick depth estimation
-            depth_map = self._estimate_depth_light(resized_frame)
-            results["depth"] = depth_map
-            
-            # 3. Basic quality check
-            quality_score = self._check_quality_light(resized_frame, surfaces)
-            results["quality_score"] = quality_score
-            
-            # 4. Generate opportunities
-            opportunities = self._generate_opportunities_light(surfaces, depth_map, quality_score)
-            results["opportunities"] = opportunities
+    def _run_batch(self, group: List[Tuple[FrameSlot, np.ndarray, Optional[int]]]):
+        """Run the lightweight pipeline over same-shape frames in one kernel call"""
+        n = len(group)
+        frames = group[0][1][None] if n == 1 else np.stack([resized for _, resized, _ in group])
+        
+        buffers = {k: v[:n] for k, v in self._get_kernel_buffers(n).items()}
+        self._get_rng().random(out=buffers["draws"], dtype=np.float32)
+        _kernels().run_pipeline_batch(
+            frames,
+            buffers["draws"],
+            buffers["bboxes"],
+            buffers["confidences"],
+            buffers["types"],
+            buffers["depth_mm"],
+            buffers["scalars"],
+            buffers["counts"]
+        )
+        
+        for b, (slot, resized_frame, signature) in enumerate(group):
+            # Wrap kernel outputs into result dicts
+            frame_buffers = {k: v[b] for k, v in buffers.items()}
+            results = self._build_results(resized_frame, frame_buffers, int(buffers["counts"][b]))
             
-            return {
-                "frame_id": frame_id,
-                "timestamp": frame_data["timestamp"],
-                "results": results,
-                "success": True
-            }
+            if signature is not None:
+                self._store_cached_results(signature, results)
             
-        except Exception as e:
-            logger.error(f"Internal processing failed: {e}")
-            return {
-                "frame_id": frame_data.get("frame_id", -1),
-                "timestamp": frame_data.get("timestamp", time.time()),
-                "results": {},
-                "success": False,
-                "error": str(e)
-            }
+            slot.results = results
+            slot.success = True
+    
+    def _fail_slot(self, slot: FrameSlot, error: Exception):
+        """Record a processing failure on a slot"""
+        logger.error(f"Internal processing failed: {error}")
+        slot.results = {}
+        slot.success = False
+        slot.error = str(error)
+    
+    def _frame_signature(self, frame: np.ndarray) -> int:
+        """64-bit perceptual hash of a frame (8x8 mean-threshold), packed in an int"""
+        cv2 = _cv2()
+        small = cv2.resize(frame, (8, 8), interpolation=cv2.INTER_AREA)
+        sig = small.mean(axis=2) if small.ndim == 3 else small.astype(np.float32)
+        return int(np.packbits(sig > sig.mean()).view(">u8")[0])
+    
+    def _lookup_cached_results(self, signature: int) -> Optional[Dict[str, Any]]:
+        """Return cached results for a near-identical frame, if any (shared, read-only)"""
+        threshold = self.config.cache_hamming_threshold
+        with self._cache_lock:
+            # Most recent entries first, Hamming distance is XOR + popcount
+            for key in reversed(self._result_cache):
+                if (key ^ signature).bit_count() <= threshold:
+                    self._result_cache.move_to_end(key)
+                    return self._result_cache[key]
+        return None
+    
+    def _store_cached_results(self, signature: int, results: Dict[str, Any]):
+        """Insert results into the bounded LRU cache"""
+        key = signature
+        with self._cache_lock:
+            self._result_cache[key] = results
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > self.config.cache_max_entries:
+                self._result_cache.popitem(last=False)
+    
+    def _get_rng(self) -> np.random.Generator:
+        """Get the calling worker's random generator"""
+        rng = getattr(self._thread_local, "rng", None)
+        if rng is None:
+            rng = np.random.default_rng()
+            self._thread_local.rng = rng
+        return rng
+    
+    def _get_kernel_buffers(self, n: int) -> Dict[str, np.ndarray]:
+        """Get the calling worker's preallocated kernel output buffers, at least n rows"""
+        buffers = getattr(self._thread_local, "kernel_buffers", None)
+        # The kernel does no bounds checks, regrow if batch_size was raised
+        if buffers is None or len(buffers["counts"]) < n:
+            buffers = _kernels().allocate_buffers(max(n, self.config.batch_size))
+            self._thread_local.kernel_buffers = buffers
+        return buffers
+    
+    def _build_results(self, frame: np.ndarray, buffers: Dict[str, np.ndarray],
+                       num_surfaces: int) -> Dict[str, Any]:
+        """Convert kernel output buffers into the pipeline results dict"""
+        h, w = frame.shape[:2]
+        scalars = buffers["scalars"]
+        quality_score = float(scalars[_kernels().OUT_QUALITY_SCORE])
+        
+        # Copy out of the per-worker buffers, the next frame reuses them
+        bboxes = buffers["bboxes"][:num_surfaces].copy()
+        confidences = buffers["confidences"][:num_surfaces].copy()
+        types = buffers["types"][:num_surfaces].copy()
+        
+        return {
+            "surfaces": SurfaceSet(bboxes, confidences, types),
+            "depth": {
+                "depth_map_shape": (h, w),
+                # Millimetres to metres only at the API boundary
+                "mean_depth": int(buffers["depth_mm"][_kernels().DEPTH_MEAN]) / 1000.0,
+                "depth_range": [_kernels().DEPTH_MIN_MM / 1000.0, _kernels().DEPTH_MAX_MM / 1000.0],
+                "confidence": float(scalars[_kernels().OUT_DEPTH_CONFIDENCE])
+            },
+            "quality_score": quality_score,
+            "opportunities": self._generate_opportunities_light(
+                bboxes, confidences, types, quality_score
+            )
+        }
+    
+    def _generate_opportunities_light(self, bboxes: np.ndarray, confidences: np.ndarray,
+                                      types: np.ndarray, quality_score: float) -> OpportunitySet:
+        """Generate placement opportunities from edge analysis"""
+        idx = np.flatnonzero(confidences > _kernels().OPPORTUNITY_MIN_CONFIDENCE)
+        idx = idx[self._suppress_overlaps(bboxes[idx], confidences[idx])]
+        prs_scores = np.minimum(quality_score * confidences[idx], 100.0).astype(np.float32)
+        
+        return OpportunitySet(idx, bboxes[idx], confidences[idx], types[idx], prs_scores)
+    
+    def _suppress_overlaps(self, bboxes: np.ndarray, confidences: np.ndarray) -> np.ndarray:
+        """Keep-mask dropping boxes that overlap a higher-confidence box (fast NMS)"""
+        if len(confidences) < 2:
+            return np.ones(len(confidences), dtype=bool)
+        
+        order = np.argsort(-confidences, kind="stable")
+        iou = packed_bbox_iou(pack_bboxes(bboxes[order]))
+        
+        # Column j's max over rows above it is its overlap with any stronger box
+        keep_sorted = np.triu(iou, k=1).max(axis=0) <= self.config.opportunity_nms_iou
+        keep = np.empty_like(keep_sorted)
+        keep[order] = keep_sorted
+        return keep
     
     def _resize_for_edge(self, frame: np.ndarray) -> np.ndarray:
         """Resize frame for edge processing constraints"""
         h, w = frame.shape[:2]
+        
+        # Input shape rarely changes within a session, plan once per shape
+        plan = self._resize_cache.get((h, w))
+        if plan is None:
+            plan = self._plan_resize(h, w)
+            self._resize_cache[(h, w)] = plan
+        
+        new_h, new_w, steps = plan
+        if not steps:
+            return frame
+        
+        if self._torch is not None:
+            return self._resize_on_gpu(frame, new_h, new_w)
+        
+        cv2 = _cv2()
+        resized = cv2.UMat(frame) if self._use_opencl else frame
+        for size, interp in steps:
+            resized = cv2.resize(resized, size, interpolation=interp)
+        
+        return resized.get() if self._use_opencl else resized
+    
+    def _plan_resize(self, h: int, w: int) -> Tuple[int, int, List[Tuple[Tuple[int, int], int]]]:
+        """Target size and cv2 resize steps for one input shape"""
+        cv2 = _cv2()
         max_h, max_w = self.config.max_resolution
         
         if h <= max_h and w <= max_w:
-            return frame
+            return h, w, []
         
         # Calculate scaling factor
         scale = min(max_h / h, max_w / w)
         new_h, new_w = int(h * scale), int(w * scale)
         
-        return cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
-    
-    def _detect_surfaces_light(self, frame: np.ndarray) -> List[Dict[str, Any]]:
-        """Lightweight surface detection"""
-        # Mock lightweight surface detection
-        time.sleep(0.005)  # Simulate fast processing
-        
-        # Generate mock surfaces
-        h, w = frame.shape[:2]
-        surfaces = []
-        
-        for i in range(np.random.randint(0, 3)):  # 0-2 surfaces
-            x = np.random.randint(0, w//2)
-            y = np.random.randint(0, h//2)
-            width = np.random.randint(50, w//3)
-            height = np.random.randint(30, h//3)
-            
-            surface = {
-                "surface_id": f"edge_surf_{i:03d}",
-                "bbox": [x, y, x + width, y + height],
-                "confidence": 0.7 + np.random.random() * 0.2,
-                "surface_type": np.random.choice(["wall", "table", "screen"]),
-                "area_pixels": width * height
-            }
-            surfaces.append(surface)
-        
-        return surfaces
-    
-    def _estimate_depth_light(self, frame: np.ndarray) -> Dict[str, Any]:
-        """Lightweight depth estimation"""
-        # Mock lightweight depth estimation
-        time.sleep(0.008)  # Simulate fast processing
+        # Exact 2x box-filter halvings are cheap and alias-free, while
+        # INTER_AREA at arbitrary ratios is several times slower than bilinear,
+        # so halve while possible and finish the remaining <2x with bilinear
+        steps = []
+        while h // 2 >= new_h and w // 2 >= new_w:
+            h, w = h // 2, w // 2
+            steps.append(((w, h), cv2.INTER_AREA))
+        if (h, w) != (new_h, new_w):
+            steps.append(((new_w, new_h), cv2.INTER_LINEAR))
         
-        h, w = frame.shape[:2]
-        
-        return {
-            "depth_map_shape": (h, w),
-            "mean_depth": 3.5 + np.random.random() * 2.0,
-            "depth_range": [1.0, 8.0],
-            "confidence": 0.6 + np.random.random() * 0.2
-        }
+        return new_h, new_w, steps
     
-    def _check_quality_light(self, frame: np.ndarray, surfaces: List[Dict]) -> float:
-        """Lightweight quality assessment"""
-        # Mock quality check
-        time.sleep(0.003)
+    def _configure_resize_backend(self):
+        """Pick CUDA, OpenCL (UMat) or plain cv2 resize from use_gpu_acceleration"""
+        gpu = self.config.use_gpu_acceleration
+        self._torch = self._init_gpu_resize() if gpu else None
+        self._use_opencl = gpu and self._torch is None and _cv2().ocl.haveOpenCL()
+        self._resize_cache.clear()
+    
+    def _init_gpu_resize(self):
+        """Return torch if CUDA resize is usable, else None (cv2 fallback)"""
+        try:
+            import torch
+            if torch.cuda.is_available():
+                logger.info("Using CUDA resize for edge frames")
+                return torch
+        except ImportError:
+            pass
+        logger.info("CUDA not available, using cv2 resize for edge frames")
+        return None
+    
+    def _get_pinned_buffer(self, nbytes: int):
+        """Get the calling thread's pinned staging buffer, growing it if needed"""
+        thread_id = threading.get_ident()
+        pinned = self._pinned_buffers.get(thread_id)
+        if pinned is None or pinned.numel() < nbytes:
+            pinned = self._torch.empty(nbytes, dtype=self._torch.uint8, pin_memory=True)
+            self._pinned_buffers[thread_id] = pinned
+        return pinned
+    
+    def _resize_on_gpu(self, frame: np.ndarray, new_h: int, new_w: int) -> np.ndarray:
+        """Bilinear resize on CUDA via a pinned-memory staging buffer"""
+        torch = self._torch
+        import torch.nn.functional as F
         
-        base_quality = 60 + np.random.random() * 30
+        staging = self._get_pinned_buffer(frame.nbytes)[:frame.size].view(frame.shape)
+        staging.copy_(torch.from_numpy(frame))
         
-        # Bonus for detected surfaces
-        surface_bonus = len(surfaces) * 5
+        # Async H2D copy overlaps with work still queued on the device
+        src = staging.to("cuda", non_blocking=True)
+        src = src.permute(2, 0, 1).unsqueeze(0).float()
+        resized = F.interpolate(src, size=(new_h, new_w), mode="bilinear", align_corners=False)
+        resized = resized.squeeze(0).permute(1, 2, 0).round_().clamp_(0, 255).to(torch.uint8)
         
-        return min(100, base_quality + surface_bonus)
-    
-    def _generate_opportunities_light(self, 
-                                    surfaces: List[Dict],
-                                    depth_map: Dict[str, Any],
-                                    quality_score: float) -> List[Dict[str, Any]]:
-        """Generate placement opportunities from edge analysis"""
-        opportunities = []
-        
-        for surface in surfaces:
-            if surface["confidence"] > 0.6:  # Quality threshold for edge
-                opportunity = {
-                    "opportunity_id": f"edge_opp_{len(opportunities):03d}",
-                    "surface_id": surface["surface_id"],
-                    "prs_score": min(quality_score * surface["confidence"], 100),
-                    "placement_type": surface["surface_type"],
-                    "bbox": surface["bbox"],
-                    "confidence": surface["confidence"],
-                    "edge_processed": True
-                }
-                opportunities.append(opportunity)
-        
-        return opportunities
+        # Kernels run on host memory, so only the downscaled frame comes back
+        return resized.cpu().numpy()
     
     def _monitoring_worker(self):
         """Monitor performance and system resources"""
         while self.is_running:
             try:
                 # Update queue depths
-                self.stats.queue_depth = self.input_queue.qsize()
+                self._set_stats(queue_depth=len(self._input_deque))
                 
                 # Calculate average FPS
                 if len(self.frame_times) > 0:
-                    recent_times = self.frame_times[-30:]  # Last 30 frames
+                    recent_times = list(self.frame_times)[-30:]  # Last 30 frames
                     if len(recent_times) > 1:
-                        time_diff = recent_times[-1] - recent_times[0]
-                        self.stats.avg_fps = (len(recent_times) - 1) / time_diff if time_diff > 0 else 0
+                        time_diff = (recent_times[-1] - recent_times[0]) / 1e9
+                        self._set_stats(
+                            avg_fps=(len(recent_times) - 1) / time_diff if time_diff > 0 else 0
+                        )
+                
+                self._update_latency_stats()
                 
                 # Mock system resource monitoring
-                self.stats.memory_usage_mb = 128 + np.random.random() * 64
-                self.stats.cpu_usage_percent = 30 + np.random.random() * 20
-                self.stats.gpu_usage_percent = 15 + np.random.random() * 25
+                self._set_stats(
+                    memory_usage_mb=128 + np.random.random() * 64,
+                    cpu_usage_percent=30 + np.random.random() * 20,
+                    gpu_usage_percent=15 + np.random.random() * 25
+                )
                 
                 # Cleanup old models if needed
                 if time.time() - self.last_cleanup > 300:  # Every 5 minutes
@@ -395,20 +780,59 @@ class EdgeProcessor:
             except Exception as e:
                 logger.error(f"Monitoring error: {e}")
     
-    def _update_performance_stats(self, processing_time_ms: float):
+    def _update_performance_stats(self, processing_time_ns: int, end_ns: int):
         """Update performance statistics"""
-        current_time = time.time()
-        
         # Add to frame time history
-        self.frame_times.append(current_time)
-        if len(self.frame_times) > self.max_frame_history:
-            self.frame_times.pop(0)
-        
-        # Update processing time (exponential moving average)
-        alpha = 0.1
-        self.stats.processing_time_ms = (
-            alpha * processing_time_ms + 
-            (1 - alpha) * self.stats.processing_time_ms
+        self.frame_times.append(end_ns)
+        
+        # Only this worker writes its histogram, the monitor just reads it
+        latency = getattr(self._thread_local, "latency", None)
+        if latency is None:
+            latency = self._register_latency_histogram()
+        
+        bucket = min(processing_time_ns // LATENCY_BUCKET_NS, LATENCY_BUCKETS - 1)
+        latency["hist"][bucket] += 1
+        latency["total_ns"][0] += processing_time_ns
+    
+    def _register_latency_histogram(self) -> Dict[str, np.ndarray]:
+        """Create the calling worker's latency histogram and publish it to the monitor"""
+        latency = {
+            "hist": np.zeros(LATENCY_BUCKETS, np.uint32),
+            "total_ns": np.zeros(1, np.int64)
+        }
+        self._thread_local.latency = latency
+        with self._stats_lock:
+            self._latency_hists.append(latency)
+        return latency
+    
+    def _update_latency_stats(self):
+        """Fold worker histograms into mean and tail latency over the last interval"""
+        with self._stats_lock:
+            workers = list(self._latency_hists)
+        
+        hist = np.zeros(LATENCY_BUCKETS, np.int64)
+        total_ns = 0
+        for latency in workers:
+            hist += latency["hist"]
+            total_ns += int(latency["total_ns"][0])
+        
+        # Histograms are cumulative, diff against the previous fold
+        prev_hist, prev_ns = self._latency_prev
+        self._latency_prev = (hist, total_ns)
+        window = hist - prev_hist
+        count = int(window.sum())
+        if count == 0:
+            return
+        
+        # Report the upper edge of the bucket holding each percentile
+        cumulative = np.cumsum(window)
+        p50, p95, p99 = np.searchsorted(cumulative, np.ceil(np.array([0.50, 0.95, 0.99]) * count))
+        bucket_ms = LATENCY_BUCKET_NS / 1e6
+        self._set_stats(
+            processing_time_ms=(total_ns - prev_ns) / count / 1e6,
+            latency_p50_ms=(p50 + 1) * bucket_ms,
+            latency_p95_ms=(p95 + 1) * bucket_ms,
+            latency_p99_ms=(p99 + 1) * bucket_ms
         )
     
     def _cleanup_models(self):
@@ -429,6 +853,14 @@ class EdgeProcessor:
         except Exception as e:
             logger.error(f"Model cleanup failed: {e}")
     
+    def _pop_inputs(self, timeout: float, max_items: int) -> List[int]:
+        """Take up to max_items oldest queued slot indices, waiting up to timeout for the first"""
+        with self._input_cv:
+            if not self._input_deque:
+                self._input_cv.wait(timeout)
+            count = min(max(1, max_items), len(self._input_deque))
+            return [self._input_deque.popleft() for _ in range(count)]
+    
     def _clear_queue(self, queue: Queue):
         """Clear all items from a queue"""
         try:
@@ -437,16 +869,27 @@ class EdgeProcessor:
         except Empty:
             pass
     
+    def _bump_stat(self, name: str, amount: int = 1):
+        """Atomically increment a stats counter"""
+        with self._stats_lock:
+            self._stats[name] += amount
+    
+    def _set_stats(self, **values):
+        """Atomically overwrite stats fields"""
+        with self._stats_lock:
+            self._stats.update(values)
+    
     def get_performance_stats(self) -> ProcessingStats:
-        """Get current performance statistics"""
-        return self.stats
+        """Get a consistent snapshot of current performance statistics"""
+        with self._stats_lock:
+            return ProcessingStats(**self._stats)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about loaded models"""
         return {
             "loaded_models": list(self.model_cache.keys()),
             "model_count": len(self.model_cache),
-            "memory_per_model_mb": self.stats.memory_usage_mb / max(len(self.model_cache), 1)
+            "memory_per_model_mb": self.get_performance_stats().memory_usage_mb / max(len(self.model_cache), 1)
         }
     
     def optimize_for_device(self, device_type: str = "cpu") -> bool:
@@ -469,6 +912,9 @@ class EdgeProcessor:
                 self.config.processing_threads = min(2, self.config.processing_threads)
                 self.config.quality_preset = "balanced"
             
+            # Resize backend follows use_gpu_acceleration, plans depend on max_resolution
+            self._configure_resize_backend()
+            
             logger.info(f"Optimized for device type: {device_type}")
             return True
             
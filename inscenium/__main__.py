@@ -1,7 +1,15 @@
 # Auto-generated CLI trampoline for Inscenium
 from importlib import import_module
+from importlib.util import find_spec
 import sys
 
+def _has_module(mod):
+    # Probe the spec only, so a missing target never runs heavy imports
+    try:
+        return find_spec(mod) is not None
+    except ImportError:
+        return False
+
 def _try_targets():
     # Try common places where a Typer app(named `app`) might live
     for mod, attr in (
@@ -9,13 +17,19 @@ def _try_targets():
         ("inscenium.cli.video", "app"),
         ("inscenium.cli.__main__", "app"),
     ):
+        if not _has_module(mod):
+            continue
         try:
             m = import_module(mod)
-            a = getattr(m, attr)
+        except ImportError as e:
+            print(f"inscenium: could not import {mod}: {e}", file=sys.stderr)
+            continue
+        a = getattr(m, attr, None)
+        if a is not None:
             return ("typer-app", a)  # Typer app callable
-        except Exception:
-            pass
     # Fallback: if there is a `video` function, wrap it into a tiny Typer app
+    if not _has_module("inscenium.cli.video"):
+        return (None, None)
     try:
         m = import_module("inscenium.cli.video")
         if hasattr(m, "video"):
@@ -1,13 +1,19 @@
 """Video processing CLI using Typer."""
 
+import copy
+import functools
 import json
 import os
+import queue
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 import subprocess
 
+import numpy as np
+
 try:
     import typer
     import yaml
@@ -25,22 +31,48 @@ try:
 except ImportError:
     HAS_RICH = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 from inscenium.io.video_reader import VideoReader, VideoWriter, probe_video
-from inscenium.perception.detect import detect
+from inscenium.io.ffmpeg_reader import FFmpegReader, ffmpeg_available
+from inscenium.perception.detect import detect_batch, preload_detector
 from inscenium.tracking.byte_tracker import ByteTracker
-from inscenium.uaor.score import blur_estimate, uncertainty_score, occlusion_score
+from inscenium.uaor.score import (
+    BLUR_DOWNSAMPLE, downsample_gray, compute_frame_quality, uncertainty_score, occlusion_score
+)
 from inscenium.events.sgi_writer import SGIWriter
 from inscenium.render.overlay import OverlayRenderer
-from inscenium.util.metrics import Metrics
-from inscenium.util.logging import setup_logging
+from inscenium.util.metrics import (
+    Metrics, STAGE_DETECTION, STAGE_TRACKING, STAGE_UAOR, STAGE_SGI_WRITE, STAGE_RENDER
+)
+from inscenium.util.logging import setup_logging, stop_file_logging
 from inscenium import __version__
 from inscenium.util.fs import safe_mkdirs
 
 app = typer.Typer() if HAS_TYPER else None
 
 
+def _dump(obj, path: Path):
+    """Write obj as indented JSON, via orjson when available."""
+    if HAS_ORJSON:
+        path.write_bytes(orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2)
+
+
+@functools.lru_cache(maxsize=None)
 def get_git_sha() -> Optional[str]:
-    """Get current git SHA if available."""
+    """Get current git SHA if available, INS_GIT_SHA overrides the git lookup."""
+    env_sha = os.environ.get("INS_GIT_SHA")
+    if env_sha:
+        return env_sha[:8]
     try:
         result = subprocess.run(
             ["git", "rev-parse", "HEAD"],
@@ -57,15 +89,27 @@ def get_git_sha() -> Optional[str]:
 
 def load_config(profile: str) -> dict:
     """Load pipeline configuration."""
+    # Callers modify their config, so each gets its own copy of the cached one
+    return copy.deepcopy(_read_config(profile))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_config(profile: str) -> dict:
+    """Read a profile's config file once per process."""
     config_path = Path(f"configs/pipeline/{profile}_default.yaml")
     if not config_path.exists():
         # Fallback config
         return {
             "profile": profile,
             "decode": {"every_nth": 1, "max_failures": 100},
-            "perception": {"detector": "torchvision_frcnn", "score_threshold": 0.5},
+            "perception": {
+                "detector": "torchvision_frcnn",
+                "score_threshold": 0.5,
+                # None leaves the backend to INS_BACKEND (torch by default)
+                "backend": "trt" if profile == "trt" else None
+            },
             "tracking": {"type": "byte", "max_age": 30, "iou_thresh": 0.3},
-            "uaor": {"enable": True, "blur_kernel": 5, "conf_decay_alpha": 0.15},
+            "uaor": {"enable": True, "blur_kernel": 5, "blur_every": 5, "conf_decay_alpha": 0.15},
             "render": {"enable": True, "trails": True, "font_scale": 0.5},
             "export": {
                 "write_overlay_mp4": True,
@@ -135,7 +179,8 @@ def video(
     pretty: bool = typer.Option(False, "--pretty/--no-pretty", help="Enable pretty output with progress bars"),
     quiet: bool = typer.Option(False, "--quiet", help="Reduce log verbosity"),
     json_logs: bool = typer.Option(False, "--json-logs", help="Force JSON log format"),
-    hud: str = typer.Option("no", help="Enable HUD overlay (yes/no)")
+    hud: str = typer.Option("no", help="Enable HUD overlay (yes/no)"),
+    batch_size: Optional[int] = typer.Option(None, "--batch-size", help="Frames per detection batch (default: 1 for cpu profile, 16 otherwise)")
 ):
     """Process video through Inscenium pipeline."""
     
@@ -194,6 +239,17 @@ def video(
     config["render"]["enable"] = render_overlay.lower() == "yes"
     config["render"]["hud"] = hud.lower() == "yes"
     
+    # Detection backend is read by the detector at call time, only an
+    # explicitly configured one overrides the environment
+    backend = config["perception"].get("backend")
+    if backend:
+        os.environ["INS_BACKEND"] = backend
+    
+    # Batch detection pays off on accelerators, one frame at a time on CPU
+    if batch_size is None:
+        batch_size = 1 if profile == "cpu" else 16
+    config["perception"]["batch_size"] = max(1, batch_size)
+    
     # Wire max_frames to decode.max_frames if provided
     if max_frames is not None:
         config.setdefault("decode", {})["max_frames"] = max_frames
@@ -221,6 +277,14 @@ def video(
     probe_info = probe_video(str(input_path))
     logger.info(f"Video info: {probe_info}")
     
+    # Load (and warm up, when compiling) the detector before timing starts
+    if probe_info.get("width") and probe_info.get("height"):
+        preload_detector(
+            (probe_info["height"], probe_info["width"]), config["perception"]["batch_size"]
+        )
+    else:
+        preload_detector()
+    
     # Setup output video writer
     video_writer = None
     if config["export"]["write_overlay_mp4"] and renderer:
@@ -233,10 +297,21 @@ def video(
     
     try:
         # Process video
-        with VideoReader(
+        # The ffmpeg pipe reader is opt-in, OpenCV stays the default decoder
+        reader_cls = VideoReader
+        if os.environ.get("VIDEO_READER") == "ffmpeg":
+            if ffmpeg_available():
+                reader_cls = FFmpegReader
+            else:
+                logger.warning("VIDEO_READER=ffmpeg but ffmpeg is not installed, using OpenCV")
+        # Frames in flight: both stage queues (2 batches each), the batch being
+        # analysed, the frame being written and the one decode is queueing
+        batch_size = config["perception"]["batch_size"]
+        with reader_cls(
             str(input_path), 
             every_nth=config["decode"]["every_nth"],
-            max_failures=config["decode"]["max_failures"]
+            max_failures=config["decode"]["max_failures"],
+            pool_size=5 * batch_size + 2
         ) as reader:
             
             if video_writer:
@@ -256,126 +331,249 @@ def video(
                     TimeElapsedColumn(),
                     console=console
                 )
-                decode_task = progress.add_task("🎬 Decoding", total=total_frames)
-                detect_task = progress.add_task("👁️  Detection", total=total_frames)
-                track_task = progress.add_task("🏃 Tracking", total=total_frames)
-                render_task = progress.add_task("🎨 Rendering", total=total_frames)
+                # Stages run per frame in lockstep, so one bar covers them all
+                process_task = progress.add_task("🎬 Processing", total=total_frames)
                 progress.start()
             
-            for frame_idx, ts_sec, frame_bgr in reader.frames():
-                frame_start = time.time()
-                
+            # Three-stage pipeline: decode -> detect/track/UAOR -> SGI/render,
+            # with bounded queues so decode and writes overlap inference
+            q_decoded = queue.Queue(maxsize=batch_size * 2)
+            q_scored = queue.Queue(maxsize=batch_size * 2)
+            stop = threading.Event()
+            
+            def put(q, item):
+                """Enqueue unless the pipeline is shutting down."""
+                while not stop.is_set():
+                    try:
+                        q.put(item, timeout=0.1)
+                        return
+                    except queue.Full:
+                        continue
+            
+            def get(q):
+                """Dequeue, or None once the pipeline is shutting down."""
+                while not stop.is_set():
+                    try:
+                        return q.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                return None
+            
+            def decode_stage():
+                """Stage A: decode frames."""
                 try:
-                    # Stage 1: Detection
-                    detect_start = metrics.timer_start("detection")
-                    detections = detect(
-                        frame_bgr, 
-                        config["perception"]["score_threshold"]
+                    for item in reader.frames():
+                        if stop.is_set():
+                            break
+                        put(q_decoded, item)
+                except Exception as e:
+                    logger.error(f"Decode stage failed: {e}")
+                finally:
+                    put(q_decoded, None)
+            
+            # Blur comes from one downsampled gray copy per sample, taken only
+            # every blur_every frames
+            blur_every = max(1, config["uaor"].get("blur_every", 5))
+            quality_state = {
+                "frames": 0,
+                "value": {"blur": 0.5},
+                "small_bgr": None,
+                "gray": None,
+                "laplacian": None
+            }
+            
+            def frame_quality(frame_bgr):
+                """Quality scores for a frame, reusing the last ones between samples."""
+                if quality_state["frames"] % blur_every == 0 and frame_bgr is not None and frame_bgr.size:
+                    h, w = frame_bgr.shape[:2]
+                    small_shape = (max(1, h // BLUR_DOWNSAMPLE), max(1, w // BLUR_DOWNSAMPLE))
+                    if quality_state["gray"] is None or quality_state["gray"].shape != small_shape:
+                        quality_state["small_bgr"] = np.empty(small_shape + (3,), dtype=np.uint8)
+                        quality_state["gray"] = np.empty(small_shape, dtype=np.uint8)
+                        quality_state["laplacian"] = np.empty(small_shape, dtype=np.float32)
+                    gray = downsample_gray(
+                        frame_bgr, BLUR_DOWNSAMPLE, quality_state["small_bgr"], quality_state["gray"]
                     )
-                    metrics.timer_end("detection", detect_start)
-                    
-                    if not detections:
-                        metrics.increment("frames_no_detections")
-                    
-                    # Stage 2: Tracking
-                    track_start = metrics.timer_start("tracking")
-                    tracks = tracker.update(detections)
-                    metrics.timer_end("tracking", track_start)
-                    
-                    # Stage 3: UAOR scoring
-                    uaor_start = metrics.timer_start("uaor")
-                    
-                    frame_blur = blur_estimate(frame_bgr, config["uaor"]["blur_kernel"])
-                    
-                    # Calculate average uncertainty for all tracks
-                    avg_uncertainty = 0.0
-                    if tracks:
-                        uncertainties = [
-                            uncertainty_score(track, config["uaor"]["conf_decay_alpha"]) 
-                            for track in tracks
-                        ]
-                        avg_uncertainty = sum(uncertainties) / len(uncertainties)
-                    
-                    occlusion = occlusion_score({}, tracks)
-                    
-                    uaor_scores = {
-                        "occlusion": occlusion,
-                        "uncertainty": avg_uncertainty,
-                        "blur": frame_blur
-                    }
-                    
-                    metrics.timer_end("uaor", uaor_start)
-                    
-                    # Stage 4: Write SGI data
-                    sgi_start = metrics.timer_start("sgi_write")
-                    
-                    # Add track IDs to detections for SGI
-                    objects_with_ids = []
-                    for i, det in enumerate(detections):
-                        if i < len(tracks):
-                            det_with_id = det.copy()
-                            det_with_id["id"] = tracks[i]["id"]
-                            objects_with_ids.append(det_with_id)
-                        else:
-                            det_with_id = det.copy()
-                            det_with_id["id"] = -1
-                            objects_with_ids.append(det_with_id)
-                    
-                    sgi_writer.write_frame_data(
-                        frame_idx, ts_sec, objects_with_ids, tracks, uaor_scores
+                    quality_state["value"] = compute_frame_quality(
+                        gray, config["uaor"]["blur_kernel"], quality_state["laplacian"]
                     )
-                    metrics.timer_end("sgi_write", sgi_start)
-                    
-                    # Stage 5: Render overlay (optional)
-                    if renderer and config["render"]["enable"]:
-                        render_start = metrics.timer_start("render")
+                quality_state["frames"] += 1
+                return quality_state["value"]
+            
+            def analyze_batch(batch):
+                """Detect a batch of frames in one pass, then track and score each frame."""
+                # Stage 1: Detection
+                try:
+                    with metrics.time(STAGE_DETECTION):
+                        detections_list = detect_batch(
+                            [frame_bgr for _, _, frame_bgr in batch],
+                            config["perception"]["score_threshold"]
+                        )
+                except Exception as e:
+                    logger.warning(f"Batch detection failed: {e}")
+                    for frame_idx, _, frame_bgr in batch:
+                        # Dropped frames go straight back to the (thread-safe) pool
+                        reader.release_frame(frame_bgr)
+                        put(q_scored, (frame_idx, None))
+                    return
+                
+                for (frame_idx, ts_sec, frame_bgr), detections in zip(batch, detections_list):
+                    try:
+                        # Stage 2: Tracking
+                        with metrics.time(STAGE_TRACKING):
+                            tracks = tracker.update(detections)
                         
-                        overlay_frame = renderer.render_frame(frame_bgr, tracks, uaor_scores)
+                        # Stage 3: UAOR scoring
+                        with metrics.time(STAGE_UAOR):
+                            quality = frame_quality(frame_bgr)
                         
-                        if video_writer:
-                            video_writer.write(overlay_frame)
-                            
-                        # Save thumbnails for interesting moments
-                        if (config["export"]["write_thumbs"] and 
-                            (len(tracks) > 0 or frame_idx % 30 == 0)):
-                            renderer.save_thumbnail(
-                                overlay_frame, frame_idx, output_dir / "thumbs"
-                            )
+                            # Calculate average uncertainty for all tracks
+                            avg_uncertainty = 0.0
+                            if tracks:
+                                uncertainties = [
+                                    uncertainty_score(track, config["uaor"]["conf_decay_alpha"]) 
+                                    for track in tracks
+                                ]
+                                avg_uncertainty = sum(uncertainties) / len(uncertainties)
                         
-                        metrics.timer_end("render", render_start)
-                    
-                    # Update metrics
-                    frame_time = time.time() - frame_start
-                    metrics.update_fps(frame_time)
-                    metrics.increment("frames_processed")
-                    frame_count += 1
-                    
-                    # Update progress bars
-                    if progress:
-                        progress.update(decode_task, completed=frame_count)
-                        progress.update(detect_task, completed=frame_count)
-                        progress.update(track_task, completed=frame_count)
-                        if config["render"]["enable"]:
-                            progress.update(render_task, completed=frame_count)
+                            occlusion = occlusion_score({}, tracks)
+                        
+                            uaor_scores = {
+                                "occlusion": occlusion,
+                                "uncertainty": avg_uncertainty,
+                                **quality
+                            }
+                        
+                        put(q_scored, (frame_idx, (ts_sec, frame_bgr, detections, tracks, uaor_scores)))
+                        
+                    except Exception as e:
+                        logger.warning(f"Frame {frame_idx} processing failed: {e}")
+                        reader.release_frame(frame_bgr)
+                        put(q_scored, (frame_idx, None))
+            
+            def analyze_stage():
+                """Stage B: batch detection, tracking and UAOR scoring."""
+                batch = []
+                try:
+                    while not stop.is_set():
+                        item = get(q_decoded)
+                        if item is not None:
+                            batch.append(item)
+                        if batch and (item is None or len(batch) >= batch_size):
+                            analyze_batch(batch)
+                            batch = []
+                        if item is None:
+                            break
+                except Exception as e:
+                    logger.error(f"Analysis stage failed: {e}")
+                finally:
+                    put(q_scored, None)
+            
+            stage_threads = [
+                threading.Thread(target=decode_stage, name="ins-decode", daemon=True),
+                threading.Thread(target=analyze_stage, name="ins-analyze", daemon=True)
+            ]
+            for thread in stage_threads:
+                thread.start()
+            
+            # Stage C (this thread): SGI write, render and bookkeeping. Only this
+            # stage touches counters and progress bars.
+            try:
+                last_done = time.time()
+                while True:
+                    item = q_scored.get()
+                    if item is None:
+                        break
                     
-                    # Progress logging
-                    if frame_count % 100 == 0:
-                        logger.info(f"Processed {frame_count} frames, "
-                                  f"FPS: {metrics.get_avg_fps():.1f}, "
-                                  f"Tracks: {len(tracks)}")
+                    frame_idx, scored = item
+                    if scored is None:
+                        metrics.increment("frames_dropped")
+                        continue
+                    ts_sec, frame_bgr, detections, tracks, uaor_scores = scored
                     
-                except Exception as e:
-                    logger.warning(f"Frame {frame_idx} processing failed: {e}")
-                    metrics.increment("frames_dropped")
-                    continue
+                    try:
+                        if not detections:
+                            metrics.increment("frames_no_detections")
+                        
+                        # Stage 4: Write SGI data
+                        with metrics.time(STAGE_SGI_WRITE):
+                            # Add track IDs to detections, built directly in SGI object form
+                            num_tracks = len(tracks)
+                            objects_with_ids = [
+                                {
+                                    "id": tracks[i]["id"] if i < num_tracks else -1,
+                                    "label": det["label"],
+                                    "bbox": det["bbox"],
+                                    "conf": det["conf"]
+                                }
+                                for i, det in enumerate(detections)
+                            ]
+                        
+                            sgi_writer.write_frame_data(
+                                frame_idx, ts_sec, objects_with_ids, tracks, uaor_scores
+                            )
+                        
+                        # Stage 5: Render overlay (optional)
+                        if renderer and config["render"]["enable"]:
+                            with metrics.time(STAGE_RENDER):
+                                # SGI data is written and the frame is released
+                                # right after, so draw on the decoded buffer itself
+                                overlay_frame = renderer.render_frame(
+                                    frame_bgr, tracks, uaor_scores, inplace=True
+                                )
+                            
+                                if video_writer:
+                                    video_writer.write(overlay_frame)
+                                
+                                # Save thumbnails for interesting moments
+                                if (config["export"]["write_thumbs"] and 
+                                    (len(tracks) > 0 or frame_idx % 30 == 0)):
+                                    renderer.save_thumbnail(
+                                        overlay_frame, frame_idx, output_dir / "thumbs"
+                                    )
+                        
+                        # Update metrics, stages overlap so time frames by output interval
+                        now = time.time()
+                        metrics.update_fps(now - last_done)
+                        last_done = now
+                        metrics.increment("frames_processed")
+                        frame_count += 1
+                        
+                        # Update progress bar, throttled since each update may re-render
+                        if progress and (frame_count % 10 == 0 or frame_count == total_frames):
+                            progress.update(process_task, completed=frame_count)
+                        
+                        # Progress logging
+                        if frame_count % 100 == 0:
+                            logger.info(f"Processed {frame_count} frames, "
+                                      f"FPS: {metrics.get_avg_fps():.1f}, "
+                                      f"Tracks: {len(tracks)}")
+                        
+                    except Exception as e:
+                        logger.warning(f"Frame {frame_idx} processing failed: {e}")
+                        metrics.increment("frames_dropped")
+                        continue
+                    finally:
+                        # Nothing downstream holds the frame, recycle its buffer
+                        reader.release_frame(frame_bgr)
+            finally:
+                # Unblock and wait for the producer stages before the reader closes
+                stop.set()
+                for thread in stage_threads:
+                    thread.join()
             
         # Finalize
         if progress:
+            progress.update(process_task, completed=frame_count)
             progress.stop()
             
         if video_writer:
             video_writer.__exit__(None, None, None)
             
+        if renderer:
+            renderer.close()
+        sgi_writer.close()
+            
         logger.info(f"Processing complete. {frame_count} frames processed")
         
         # Write final metrics
@@ -391,8 +589,7 @@ def video(
             })
             
             metrics_path = output_dir / "metrics.json"
-            with open(metrics_path, 'w') as f:
-                json.dump(final_metrics, f, indent=2)
+            _dump(final_metrics, metrics_path)
         
         # Write run.json metadata
         run_metadata = {
@@ -408,8 +605,7 @@ def video(
         }
         
         run_path = output_dir / "run.json"
-        with open(run_path, 'w') as f:
-            json.dump(run_metadata, f, indent=2)
+        _dump(run_metadata, run_path)
         
         # Show pretty metrics summary
         if pretty and HAS_RICH:
@@ -434,6 +630,11 @@ def video(
     except Exception as e:
         logger.error(f"Pipeline failed: {e}")
         raise typer.Exit(1)
+    finally:
+        if renderer:
+            renderer.close()
+        sgi_writer.close()
+        stop_file_logging()
 
 
 @app.command() if HAS_TYPER else lambda: None  
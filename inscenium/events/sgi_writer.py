@@ -4,10 +4,39 @@ import json
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import tempfile
+
+import numpy as np
+
+from inscenium.util.geom import polygon_contains_batch
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    logger.warning("orjson not available, using json for SGI output")
+    HAS_ORJSON = False
+
+# Output is buffered in memory and written out every N frames or at this size
+FLUSH_EVERY_FRAMES = 64
+FLUSH_MAX_BYTES = 256 * 1024
+
+
+def _json_default(obj):
+    """Convert numpy values, which json cannot serialize, to Python ones."""
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serialize to compact JSON bytes."""
+    # Tracker state carries numpy scalars such as detector confidences
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(",", ":"), default=_json_default).encode()
+
 
 def point_in_polygon(point: tuple, polygon: List[List[float]]) -> bool:
     """Test if point is inside polygon using ray casting algorithm."""
@@ -30,12 +59,6 @@ def point_in_polygon(point: tuple, polygon: List[List[float]]) -> bool:
     return inside
 
 
-def bbox_center(bbox: List[int]) -> tuple:
-    """Get center point of bbox [x, y, w, h]."""
-    x, y, w, h = bbox
-    return (x + w/2, y + h/2)
-
-
 class SGIWriter:
     """Write SGI events and track data to JSONL files."""
     
@@ -46,69 +69,97 @@ class SGIWriter:
         self.events_path = self.run_dir / "events.sgi.jsonl"
         self.tracks_path = self.run_dir / "tracks.jsonl"
         
+        # Kept open for the whole run, unbuffered since flush() writes whole batches
+        self._events_fp = open(self.events_path, "ab", buffering=0)
+        self._tracks_fp = open(self.tracks_path, "ab", buffering=0)
+        self._events_buf = bytearray()
+        self._tracks_buf = bytearray()
+        self._pending_frames = 0
+        
         # Track state for zone events
-        self.track_zones = {}  # track_id -> current_zone
+        self._prev_zone_idx = {}  # track_id -> index into self.zones, -1 for none
         self.zones = []
-        
+        self._zone_polygons = None  # self.zones polygons as float arrays
+    
     def load_zones(self, zones_path: Optional[str] = None):
         """Load zone definitions from JSON file."""
         if not zones_path:
             return
-            
+        
         try:
             with open(zones_path, 'r') as f:
                 data = json.load(f)
                 self.zones = data.get("zones", [])
+                self._zone_polygons = self._build_zone_polygons(self.zones)
                 logger.info(f"Loaded {len(self.zones)} zones")
         except Exception as e:
             logger.warning(f"Failed to load zones from {zones_path}: {e}")
-            
+    
+    def _build_zone_polygons(self, zones: List[Dict[str, Any]]) -> List[np.ndarray]:
+        """Convert zone polygons once for vectorized containment tests."""
+        return [np.asarray(zone["polygon"], dtype=np.float64) for zone in zones]
+    
+    def _assign_zones(self, centers: np.ndarray) -> np.ndarray:
+        """Index of the first zone containing each center, or -1."""
+        if not self.zones or len(centers) == 0:
+            return np.full(len(centers), -1, dtype=np.intp)
+        
+        if self._zone_polygons is None or len(self._zone_polygons) != len(self.zones):
+            self._zone_polygons = self._build_zone_polygons(self.zones)
+        
+        # (zones, tracks) containment, first matching zone wins
+        inside = np.stack([polygon_contains_batch(centers, polygon) for polygon in self._zone_polygons])
+        return np.where(inside.any(axis=0), inside.argmax(axis=0), -1)
+    
     def _detect_zone_events(self, tracks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Detect zone enter/exit events for tracks."""
         events = []
+        if not tracks:
+            return events
+        
+        # Centers of all [x, y, w, h] boxes at once
+        bboxes = np.array([track["bbox"] for track in tracks], dtype=np.float64).reshape(-1, 4)
+        centers = bboxes[:, :2] + bboxes[:, 2:] / 2
         
-        for track in tracks:
-            track_id = track["id"]
-            bbox = track["bbox"]
-            center = bbox_center(bbox)
+        current = self._assign_zones(centers)
+        previous = np.array([self._prev_zone_idx.get(track["id"], -1) for track in tracks])
+        
+        # Only tracks whose zone changed produce events
+        for i in np.flatnonzero(previous != current).tolist():
+            track_id = tracks[i]["id"]
+            previous_zone, current_zone = int(previous[i]), int(current[i])
             
-            # Find current zone
-            current_zone = None
-            for zone in self.zones:
-                if point_in_polygon(center, zone["polygon"]):
-                    current_zone = zone["name"]
-                    break
-                    
-            # Check for zone changes
-            previous_zone = self.track_zones.get(track_id)
+            # Exit previous zone
+            if previous_zone >= 0:
+                events.append({
+                    "type": "zone_exit",
+                    "track_id": track_id,
+                    "zone": self.zones[previous_zone]["name"]
+                })
             
-            if previous_zone != current_zone:
-                # Exit previous zone
-                if previous_zone is not None:
-                    events.append({
-                        "type": "zone_exit",
-                        "track_id": track_id,
-                        "zone": previous_zone
-                    })
-                    
-                # Enter new zone
-                if current_zone is not None:
-                    events.append({
-                        "type": "zone_enter", 
-                        "track_id": track_id,
-                        "zone": current_zone
-                    })
-                    
-                # Update state
-                self.track_zones[track_id] = current_zone
-                
-        return events
+            # Enter new zone
+            if current_zone >= 0:
+                events.append({
+                    "type": "zone_enter", 
+                    "track_id": track_id,
+                    "zone": self.zones[current_zone]["name"]
+                })
+            
+            # Update state
+            self._prev_zone_idx[track_id] = current_zone
         
+        return events
+    
     def write_frame_data(self, frame_idx: int, ts_sec: float, 
                         objects: List[Dict[str, Any]], 
                         tracks: List[Dict[str, Any]],
                         uaor_scores: Dict[str, float]):
-        """Write frame data to SGI and tracks files."""
+        """
+        Write frame data to SGI and tracks files.
+        
+        objects are written as given and should already be
+        {"id", "label", "bbox", "conf"} dicts.
+        """
         try:
             # Detect zone events
             zone_events = self._detect_zone_events(tracks)
@@ -117,15 +168,7 @@ class SGIWriter:
             sgi_data = {
                 "ts": ts_sec,
                 "frame": frame_idx,
-                "objects": [
-                    {
-                        "id": obj.get("id", -1),
-                        "label": obj["label"],
-                        "bbox": obj["bbox"], 
-                        "conf": obj["conf"]
-                    }
-                    for obj in objects
-                ],
+                "objects": objects,
                 "events": zone_events,
                 "uaor": {
                     "occlusion": uaor_scores.get("occlusion", 0.0),
@@ -133,45 +176,57 @@ class SGIWriter:
                 }
             }
             
-            self._append_jsonl(self.events_path, sgi_data)
+            self._append_jsonl(self._events_buf, sgi_data)
             
-            # Write individual track data
-            for track in tracks:
+            # Write the frame's tracks as one record
+            if tracks:
                 track_data = {
                     "ts": ts_sec,
                     "frame": frame_idx,
-                    "track": track
+                    "tracks": tracks
                 }
-                self._append_jsonl(self.tracks_path, track_data)
-                
+                self._append_jsonl(self._tracks_buf, track_data)
+        
         except Exception as e:
             logger.warning(f"Failed to write frame data: {e}")
-            
-    def _append_jsonl(self, path: Path, data: Dict[str, Any]):
-        """Atomically append JSON line to file."""
+        
+        self._pending_frames += 1
+        if (self._pending_frames >= FLUSH_EVERY_FRAMES or
+                len(self._events_buf) + len(self._tracks_buf) >= FLUSH_MAX_BYTES):
+            self.flush()
+    
+    def _append_jsonl(self, buf: bytearray, data: Dict[str, Any]):
+        """Append a JSON line to an output buffer."""
         try:
-            # Write to temp file first
-            with tempfile.NamedTemporaryFile(mode='w', dir=path.parent, 
-                                           prefix=f".{path.name}.", 
-                                           delete=False) as f:
-                temp_path = Path(f.name)
-                
-                # If target exists, copy existing content
-                if path.exists():
-                    with open(path, 'r') as existing:
-                        f.write(existing.read())
-                        
-                # Append new line
-                f.write(json.dumps(data) + '\n')
-                
-            # Atomic rename
-            temp_path.replace(path)
-            
+            buf += _dumps(data) + b"\n"
         except Exception as e:
-            logger.warning(f"Failed to append to {path}: {e}")
-            # Cleanup temp file if it exists
+            logger.warning(f"Failed to serialize JSONL record: {e}")
+    
+    def flush(self):
+        """Write buffered lines out, one write per file."""
+        for fp, buf in ((self._events_fp, self._events_buf), (self._tracks_fp, self._tracks_buf)):
+            if not buf or fp.closed:
+                continue
             try:
-                if 'temp_path' in locals():
-                    temp_path.unlink(missing_ok=True)
-            except:
-                pass
\ No newline at end of file
+                with memoryview(buf) as view:
+                    written = 0
+                    while written < len(view):
+                        written += fp.write(view[written:])
+            except Exception as e:
+                logger.warning(f"Failed to write to {fp.name}: {e}")
+            finally:
+                buf.clear()
+        self._pending_frames = 0
+    
+    def close(self):
+        """Flush and close the output files."""
+        self.flush()
+        for fp in (self._events_fp, self._tracks_fp):
+            if not fp.closed:
+                fp.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
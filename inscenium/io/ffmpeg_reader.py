@@ -0,0 +1,134 @@
+"""Raw frame reading from an ffmpeg subprocess pipe."""
+
+import logging
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from inscenium.io.video_reader import FramePool, probe_video
+
+logger = logging.getLogger(__name__)
+
+
+def ffmpeg_available() -> bool:
+    """Whether an ffmpeg binary is on PATH."""
+    return shutil.which("ffmpeg") is not None
+
+
+class FFmpegReader:
+    """Read BGR frames decoded by ffmpeg straight into pooled buffers.
+    
+    Drop-in for VideoReader, selected with VIDEO_READER=ffmpeg.
+    """
+    
+    def __init__(self, path: str, every_nth: int = 1, max_failures: int = 100, pool_size: int = 4):
+        self.path = Path(path)
+        self.every_nth = max(1, every_nth)
+        self.max_failures = max_failures
+        self.pool_size = max(1, pool_size)  # frames the consumer may hold at once
+        self._proc = None
+        self._fps = None
+        self._frame_count = None
+        self._pool = None
+        self._errors = 0
+        self._stderr_thread = None
+    
+    def __enter__(self):
+        info = probe_video(str(self.path))
+        if "error" in info or info["width"] <= 0 or info["height"] <= 0:
+            raise RuntimeError(f"Cannot open video: {self.path}")
+        
+        self._fps = info["fps"]
+        self._frame_count = info["frames"]
+        self._pool = FramePool((info["height"], info["width"], 3), self.pool_size)
+        
+        cmd = [
+            "ffmpeg", "-loglevel", "error", "-hwaccel", "auto",
+            "-i", str(self.path)
+        ]
+        if self.every_nth > 1:
+            # Drop skipped frames inside ffmpeg so they never cross the pipe
+            cmd += ["-vf", f"select=not(mod(n\\,{self.every_nth}))", "-vsync", "0"]
+        cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "-"]
+        try:
+            # Unbuffered so frames are read straight from the pipe into our buffers
+            self._proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0
+            )
+        except OSError as e:
+            raise RuntimeError(f"Cannot start ffmpeg for {self.path}: {e}")
+        
+        self._errors = 0
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._proc:
+            self._proc.stdout.close()
+            self._proc.kill()
+            self._proc.wait()
+            self._proc = None
+        if self._stderr_thread:
+            self._stderr_thread.join(timeout=1.0)
+            self._stderr_thread = None
+    
+    def _drain_stderr(self):
+        """Log ffmpeg's errors and count them as decode failures."""
+        for line in iter(self._proc.stderr.readline, b""):
+            self._errors += 1
+            logger.warning(f"ffmpeg: {line.decode(errors='replace').rstrip()}")
+        self._proc.stderr.close()
+    
+    def _read_into(self, buf: np.ndarray) -> bool:
+        """Fill buf with the next frame, False at end of stream."""
+        view = memoryview(buf).cast("B")
+        filled = 0
+        while filled < len(view):
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                return False
+            filled += n
+        return True
+    
+    def frames(self) -> Iterator[Tuple[int, float, np.ndarray]]:
+        """
+        Yield (frame_idx, ts_sec, frame_bgr) tuples.
+        
+        Pass each frame to release_frame() when done with it so the buffer
+        can be reused.
+        """
+        if not self._proc:
+            raise RuntimeError("FFmpegReader not initialized")
+        
+        # ffmpeg only emits every_nth-th frame, so indices advance in steps
+        frame_idx = 0
+        while True:
+            if self._errors >= self.max_failures:
+                logger.warning(f"Max failures ({self.max_failures}) reached, stopping")
+                break
+            
+            frame = self._pool.acquire()
+            if not self._read_into(frame):
+                self._pool.release(frame)
+                break
+            
+            yield frame_idx, frame_idx / self._fps, frame
+            frame_idx += self.every_nth
+    
+    def release_frame(self, frame: np.ndarray):
+        """Hand a yielded frame's buffer back for reuse by later reads."""
+        if self._pool is not None and frame is not None:
+            self._pool.release(frame)
+    
+    @property
+    def fps(self) -> float:
+        return self._fps or 30.0
+    
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count or 0
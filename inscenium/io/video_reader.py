@@ -1,6 +1,13 @@
 """Video reading and writing utilities using OpenCV."""
 
+import functools
 import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterator, Optional, Tuple
 
@@ -9,45 +16,97 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# OpenCV decodes with at most 16 threads, more only adds contention
+MAX_DECODE_THREADS = 16
+
+
+@functools.lru_cache(maxsize=None)
+def _configure_cv2_threads():
+    """Set OpenCV's thread count once per process."""
+    cv2.setNumThreads(min(MAX_DECODE_THREADS, os.cpu_count() or 1))
+
+
+class FramePool:
+    """Recycle same-shape frame buffers instead of allocating one per decode."""
+    
+    def __init__(self, shape: Tuple[int, int, int], size: int = 4):
+        self.shape = shape
+        self._free = deque(np.empty(shape, dtype=np.uint8) for _ in range(size))
+    
+    def acquire(self) -> np.ndarray:
+        """Get a free buffer, allocating a new one if all are in use."""
+        try:
+            return self._free.popleft()
+        except IndexError:
+            return np.empty(self.shape, dtype=np.uint8)
+    
+    def release(self, frame: np.ndarray):
+        """Return a buffer for reuse once nothing references it anymore."""
+        if frame.shape == self.shape and frame.dtype == np.uint8 and frame.base is None:
+            self._free.append(frame)
+
 
 class VideoReader:
     """Read video frames using cv2.VideoCapture with error tolerance."""
     
-    def __init__(self, path: str, every_nth: int = 1, max_failures: int = 100):
+    def __init__(self, path: str, every_nth: int = 1, max_failures: int = 100, pool_size: int = 4):
         self.path = Path(path)
         self.every_nth = max(1, every_nth)
         self.max_failures = max_failures
+        self.pool_size = max(1, pool_size)  # frames the consumer may hold at once
         self._cap = None
         self._fps = None
         self._frame_count = None
-        
+        self._pool = None
+    
     def __enter__(self):
+        _configure_cv2_threads()
         self._cap = cv2.VideoCapture(str(self.path))
         if not self._cap.isOpened():
             raise RuntimeError(f"Cannot open video: {self.path}")
         
         self._fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
         self._frame_count = int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        return self
         
+        width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width > 0 and height > 0:
+            self._pool = FramePool((height, width, 3), self.pool_size)
+        return self
+    
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self._cap:
             self._cap.release()
-            
+    
     def frames(self) -> Iterator[Tuple[int, float, np.ndarray]]:
-        """Yield (frame_idx, ts_sec, frame_bgr) tuples."""
+        """
+        Yield (frame_idx, ts_sec, frame_bgr) tuples.
+        
+        Frames are decoded into pooled buffers; pass each one to release_frame()
+        when done with it so the buffer can be reused.
+        """
         if not self._cap:
             raise RuntimeError("VideoReader not initialized")
-            
+        
         frame_idx = 0
         failures = 0
+        every_nth = self.every_nth
         
         while True:
-            ret, frame = self._cap.read()
-            if not ret:
+            if not self._cap.grab():
                 break
-                
-            if frame is None:
+            
+            # Skipped frames are grabbed only, never converted and copied out
+            if every_nth > 1 and frame_idx % every_nth:
+                frame_idx += 1
+                continue
+            
+            buf = self._pool.acquire() if self._pool else None
+            ret, frame = self._cap.retrieve(buf)
+            if frame is not buf and buf is not None:
+                self._pool.release(buf)
+            
+            if not ret or frame is None:
                 failures += 1
                 if failures >= self.max_failures:
                     logger.warning(f"Max failures ({self.max_failures}) reached, stopping")
@@ -55,47 +114,244 @@ class VideoReader:
                 logger.warning(f"Failed to read frame {frame_idx}")
                 frame_idx += 1
                 continue
-                
-            if frame_idx % self.every_nth == 0:
-                ts_sec = frame_idx / self._fps
-                yield frame_idx, ts_sec, frame
-                
-            frame_idx += 1
             
+            ts_sec = frame_idx / self._fps
+            yield frame_idx, ts_sec, frame
+            
+            frame_idx += 1
+    
+    def release_frame(self, frame: np.ndarray):
+        """Hand a yielded frame's buffer back for reuse by later decodes."""
+        if self._pool is not None and frame is not None:
+            self._pool.release(frame)
+    
     @property
     def fps(self) -> float:
         return self._fps or 30.0
-        
+    
     @property
     def frame_count(self) -> int:
         return self._frame_count or 0
 
 
+@dataclass(frozen=True)
+class EncoderConfig:
+    """An ffmpeg H.264 encoder and its low-latency settings."""
+    codec: str
+    args: Tuple[str, ...] = ()
+    hardware: bool = False
+
+
+# Preferred encoders, hardware first; cv2's mp4v is the last resort
+ENCODER_LADDER = (
+    EncoderConfig("h264_nvenc", ("-preset", "p4", "-tune", "ll"), hardware=True),
+    EncoderConfig("h264_qsv", ("-preset", "veryfast"), hardware=True),
+    EncoderConfig("h264_videotoolbox", ("-realtime", "1"), hardware=True),
+    EncoderConfig("libx264", ("-preset", "veryfast", "-tune", "zerolatency")),
+)
+
+# Frames sent to ffmpeg are kept, up to this many bytes, until it has written
+# output, so an encoder that fails to start can be replaced by cv2 losslessly
+STARTUP_REPLAY_BYTES = 64 << 20
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder_available(codec: str, hardware: bool) -> bool:
+    """Check an ffmpeg encoder exists, and for hardware ones that it can open."""
+    if shutil.which("ffmpeg") is None:
+        return False
+    try:
+        listed = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True, text=True, timeout=10
+        )
+        if codec not in listed.stdout:
+            return False
+        if not hardware:
+            return True
+        
+        # Builds list hardware encoders even without the device, try one frame
+        probe = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "color=c=black:s=256x256", "-frames:v", "1",
+             "-c:v", codec, "-f", "null", "-"],
+            capture_output=True, timeout=10
+        )
+        return probe.returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+
+
+def select_encoder(backend: str = "auto") -> Optional[EncoderConfig]:
+    """Pick an ffmpeg encoder for a backend name, None means cv2 mp4v."""
+    if backend == "cv2":
+        return None
+    for encoder in ENCODER_LADDER:
+        if backend not in ("auto", encoder.codec):
+            continue
+        if _encoder_available(encoder.codec, encoder.hardware):
+            return encoder
+    if backend != "auto":
+        logger.warning(f"Encoder {backend} not available, falling back")
+        return select_encoder("auto")
+    return None
+
+
 class VideoWriter:
-    """Write video frames using cv2.VideoWriter."""
+    """Write video frames via an ffmpeg H.264 encoder or cv2.VideoWriter."""
     
-    def __init__(self, path: str, fps: float, size: Tuple[int, int]):
+    def __init__(self, path: str, fps: float, size: Tuple[int, int], backend: str = "auto"):
         self.path = Path(path)
         self.fps = fps
         self.size = size
+        self.backend = backend
         self._writer = None
-        
+        self._proc = None
+        self._stderr = None
+        self._frames_written = 0
+        self._startup_frames = None
+        self._startup_bytes = 0
+    
     def __enter__(self):
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        encoder = select_encoder(self.backend)
+        if encoder is not None:
+            width, height = self.size
+            # yuv420p needs even dimensions, pad odd ones by a black line
+            pad = ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"] if width % 2 or height % 2 else []
+            cmd = [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "bgr24",
+                "-s", f"{width}x{height}", "-r", str(self.fps),
+                "-i", "-",
+                *pad,
+                "-c:v", encoder.codec, *encoder.args,
+                "-pix_fmt", "yuv420p",
+                str(self.path)
+            ]
+            # A stale file would look like ffmpeg output, see _encoder_started
+            self.path.unlink(missing_ok=True)
+            # stderr goes to a file so a dead encoder can say why
+            self._stderr = tempfile.TemporaryFile()
+            # Unbuffered, so a write fails as soon as ffmpeg is gone instead of
+            # filling a buffer the encoder never reads
+            self._proc = subprocess.Popen(
+                cmd, stdin=subprocess.PIPE, stderr=self._stderr, bufsize=0
+            )
+            self._startup_frames = []
+            self._startup_bytes = 0
+            logger.info(f"Encoding {self.path.name} with {encoder.codec}")
+            return self
+        
+        self._open_cv2_writer()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._proc:
+            try:
+                self._proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            if self._proc.wait() != 0:
+                self._encoder_died()
+            else:
+                self._close_proc()
+        if self._writer:
+            self._writer.release()
+    
+    def _open_cv2_writer(self):
         fourcc = cv2.VideoWriter_fourcc(*'mp4v')
         self._writer = cv2.VideoWriter(str(self.path), fourcc, self.fps, self.size)
         if not self._writer.isOpened():
             raise RuntimeError(f"Cannot create video writer: {self.path}")
-        return self
+    
+    def _encoder_errors(self) -> str:
+        """Last lines ffmpeg wrote to stderr."""
+        if self._stderr is None:
+            return ""
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()[-2000:]
+    
+    def _close_proc(self):
+        self._proc = None
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+    
+    def _has_output(self) -> bool:
+        """Whether ffmpeg has written anything to the output file."""
+        try:
+            return self.path.stat().st_size > 0
+        except OSError:
+            return False
+    
+    def _encoder_started(self) -> bool:
+        """Check a freshly started encoder, True once it is producing output."""
+        if self._proc.poll() is not None:
+            raise BrokenPipeError(f"ffmpeg exited with code {self._proc.returncode}")
+        return self._has_output()
+    
+    def _encoder_died(self):
+        """Handle a dead ffmpeg encoder once, instead of failing every frame."""
+        self._proc.kill()
+        self._proc.wait()
+        logger.error(f"ffmpeg encoder for {self.path} died: {self._encoder_errors()}")
+        self._close_proc()
+        startup_frames = self._startup_frames
+        self._startup_frames = None
         
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._writer:
-            self._writer.release()
-            
+        # ffmpeg never wrote output, so cv2 can write the video instead;
+        # otherwise stop rather than overwrite what ffmpeg already encoded
+        if self._has_output():
+            logger.warning(f"Overlay encoding stopped after {self._frames_written} frames")
+            return
+        
+        logger.warning(f"Falling back to cv2 for {self.path.name}")
+        self._open_cv2_writer()
+        self._frames_written = 0
+        if startup_frames is None:
+            logger.warning(f"First frames of {self.path.name} are missing after encoder failure")
+            return
+        for frame in startup_frames:
+            self._writer.write(frame)
+            self._frames_written += 1
+    
+    def _write_to_encoder(self, frame: np.ndarray):
+        """Send a frame to ffmpeg, keeping a copy while the encoder starts up."""
+        if self._startup_frames is not None:
+            if self._startup_bytes + frame.nbytes <= STARTUP_REPLAY_BYTES:
+                self._startup_frames.append(frame.copy())
+                self._startup_bytes += frame.nbytes
+            else:
+                # Too long without output to replay everything
+                self._startup_frames = None
+        
+        # bytes-like view, no tobytes() copy for contiguous frames; an
+        # unbuffered pipe may take a large frame in several writes
+        view = memoryview(np.ascontiguousarray(frame)).cast("B")
+        while view:
+            view = view[self._proc.stdin.write(view):]
+        
+        if self._startup_frames is not None and self._encoder_started():
+            self._startup_frames = None
+    
     def write(self, frame: np.ndarray):
         """Write a BGR frame."""
+        if self._proc:
+            try:
+                self._write_to_encoder(frame)
+                self._frames_written += 1
+                return
+            except (BrokenPipeError, OSError):
+                # A kept frame is replayed by the cv2 fallback with the others
+                replayed = self._startup_frames is not None
+                self._encoder_died()
+                if replayed:
+                    return
         if self._writer:
             self._writer.write(frame)
+            self._frames_written += 1
 
 
 def probe_video(path: str) -> dict:
@@ -103,7 +359,7 @@ def probe_video(path: str) -> dict:
     cap = cv2.VideoCapture(str(path))
     if not cap.isOpened():
         return {"error": f"Cannot open video: {path}"}
-        
+    
     try:
         fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -1,57 +1,126 @@
 """Object detection using torchvision or stub fallback."""
 
 import logging
-from typing import List, Dict, Any
+import os
+import time
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# COCO class names (subset)
+COCO_CLASSES = (
+    "background", "person", "bicycle", "car", "motorcycle", "airplane",
+    "bus", "train", "truck", "boat", "traffic light", "fire hydrant",
+    "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse",
+    "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack",
+    "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis",
+    "snowboard", "sports ball", "kite", "baseball bat", "baseball glove",
+    "skateboard", "surfboard", "tennis racket", "bottle", "wine glass",
+    "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich",
+    "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake",
+    "chair", "couch", "potted plant", "bed", "dining table", "toilet",
+    "tv", "laptop", "mouse", "remote", "keyboard", "cell phone",
+    "microwave", "oven", "toaster", "sink", "refrigerator", "book",
+    "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"
+)
+
 # Global detector instance
 _detector = None
 _stub_logged = False
 
+# Pinned host staging buffer for CUDA batches, reused while the shape holds
+_pinned_batch = None
+
+# Near-duplicate frame skipping (INS_DEDUP=1): frames whose 64-bit hash is
+# within DEDUP_HAMMING_THRESHOLD bits of the last detected frame reuse its
+# detections, until they are DEDUP_MAX_AGE_SEC old
+DEDUP_HAMMING_THRESHOLD = 5
+DEDUP_MAX_AGE_SEC = 2.0
+_dedup_state = {"hash": None, "detections": None, "time": 0.0}
+
 
 def _load_torchvision_detector():
     """Load torchvision FasterRCNN detector."""
     try:
         import torch
-        import torchvision.transforms as transforms
         from torchvision.models import detection
         
+        # TF32 for any fp32 matmuls on Ampere+, no-op elsewhere
+        torch.set_float32_matmul_precision("high")
+        
         model = detection.fasterrcnn_resnet50_fpn(weights="DEFAULT")
         model.eval()
         
-        # Move to CPU explicitly
-        model = model.to("cpu")
-        
-        transform = transforms.Compose([
-            transforms.ToPILImage(),
-            transforms.ToTensor()
-        ])
-        
-        # COCO class names (subset)
-        class_names = [
-            "background", "person", "bicycle", "car", "motorcycle", "airplane",
-            "bus", "train", "truck", "boat", "traffic light", "fire hydrant",
-            "stop sign", "parking meter", "bench", "bird", "cat", "dog", "horse",
-            "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack",
-            "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis",
-            "snowboard", "sports ball", "kite", "baseball bat", "baseball glove",
-            "skateboard", "surfboard", "tennis racket", "bottle", "wine glass",
-            "cup", "fork", "knife", "spoon", "bowl", "banana", "apple", "sandwich",
-            "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake",
-            "chair", "couch", "potted plant", "bed", "dining table", "toilet",
-            "tv", "laptop", "mouse", "remote", "keyboard", "cell phone",
-            "microwave", "oven", "toaster", "sink", "refrigerator", "book",
-            "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"
-        ]
-        
-        return {"model": model, "transform": transform, "classes": class_names}
+        # Tensor cores on GPU when present, CPU otherwise
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        model = model.to(device)
+        logger.info(f"Detector running on {device}")
+        
+        if _use_compile():
+            model = _compile_backbone(model)
+        
+        return {"model": model, "classes": COCO_CLASSES, "device": device}
     except ImportError as e:
         logger.warning(f"torchvision not available: {e}")
         return None
 
 
+def _use_compile() -> bool:
+    """Whether torch.compile is enabled for the detector (INS_COMPILE=1)."""
+    return os.environ.get("INS_COMPILE", "0") == "1"
+
+
+def _compile_backbone(model):
+    """
+    Compile the detector backbone with torch.compile.
+    
+    Only the backbone has static shapes per video resolution; the RPN and
+    ROI heads filter proposals data-dependently and stay eager. The batch
+    dimension is marked dynamic so a short final batch reuses the compiled
+    code. On CUDA, reduce-overhead mode replays the backbone as a CUDA graph.
+    """
+    try:
+        import torch
+        
+        class _DynamicBatchBackbone(torch.nn.Module):
+            """Compiled backbone whose input batch size may vary between calls."""
+            
+            def __init__(self, backbone):
+                super().__init__()
+                self.compiled = torch.compile(backbone, mode="reduce-overhead")
+                self.out_channels = backbone.out_channels
+                
+            def forward(self, images):
+                torch._dynamo.mark_dynamic(images, 0)
+                return self.compiled(images)
+                
+        model.backbone = _DynamicBatchBackbone(model.backbone)
+        logger.info("Detector backbone compiled with torch.compile")
+    except Exception as e:
+        logger.warning(f"torch.compile unavailable, running detector eagerly: {e}")
+    return model
+
+
+def preload_detector(frame_shape: Optional[Tuple[int, int]] = None, batch_size: int = 1):
+    """
+    Load the detector up front instead of on the first frame.
+    
+    With a (height, width) frame_shape, also run one warmup batch of
+    batch_size frames so compilation (INS_COMPILE=1) or TensorRT engine
+    building happens before the first real batch.
+    """
+    if not _use_trt():
+        _get_detector()
+        
+    if frame_shape is not None and (_use_compile() or _use_trt()):
+        height, width = frame_shape
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        detect_batch([frame] * max(1, batch_size))
+
+
 def _get_detector():
     """Get or initialize detector."""
     global _detector, _stub_logged
@@ -67,69 +136,253 @@ def _get_detector():
     return _detector
 
 
+def _use_trt() -> bool:
+    """Whether the TensorRT backend is selected (INS_BACKEND=trt)."""
+    return os.environ.get("INS_BACKEND", "torch").lower() == "trt"
+
+
+def _predictions_to_detections(predictions: Dict[str, Any], width: int, height: int,
+                               score_threshold: float, classes: Tuple[str, ...],
+                               box_scale: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    Convert one image's torch model output into detection dicts.
+    
+    box_scale maps boxes from the image the model saw back to width x height.
+    Detections are filtered by score on the device and copied back as one
+    (N, 6) tensor, so there is a single device-to-host sync per image.
+    """
+    import torch
+    
+    scores = predictions["scores"]
+    keep = scores >= score_threshold
+    packed = torch.cat([
+        predictions["boxes"][keep],
+        scores[keep].unsqueeze(1),
+        predictions["labels"][keep].unsqueeze(1).to(scores.dtype)
+    ], dim=1).cpu().numpy()
+    
+    return _arrays_to_detections(
+        packed[:, :4] * box_scale,
+        packed[:, 4],
+        packed[:, 5].astype(np.int64),
+        width, height, score_threshold, classes
+    )
+
+
+def _arrays_to_detections(boxes: np.ndarray, scores: np.ndarray, labels: np.ndarray,
+                          width: int, height: int, score_threshold: float,
+                          classes: Tuple[str, ...]) -> List[Dict[str, Any]]:
+    """Convert xyxy boxes, scores and label ids into detection dicts."""
+    keep = np.asarray(scores) >= score_threshold
+    boxes = np.asarray(boxes).reshape(-1, 4)[keep]
+    scores = np.asarray(scores)[keep]
+    labels = np.asarray(labels)[keep]
+    
+    # Clamp to image bounds, x2/y2 never left of x1/y1
+    x1 = np.clip(boxes[:, 0], 0, width)
+    y1 = np.clip(boxes[:, 1], 0, height)
+    x2 = np.maximum(x1, np.minimum(boxes[:, 2], width))
+    y2 = np.maximum(y1, np.minimum(boxes[:, 3], height))
+    
+    # Convert to [x, y, w, h], dropping empty boxes
+    xywh = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1).astype(np.int64)
+    valid = (xywh[:, 2] > 0) & (xywh[:, 3] > 0)
+    
+    names = _label_names(classes, int(labels.max()) + 1 if labels.size else 0)
+    return [
+        {
+            "bbox": bbox,
+            "conf": score,
+            "label": names[label]
+        }
+        for bbox, score, label in zip(
+            xywh[valid].tolist(), scores[valid].tolist(), labels[valid].tolist()
+        )
+    ]
+
+
+@lru_cache(maxsize=8)
+def _label_names(classes: Tuple[str, ...], count: int) -> Tuple[str, ...]:
+    """Class names for label ids below count, "class_<id>" past the known ones."""
+    return classes + tuple(f"class_{label}" for label in range(len(classes), count))
+
+
+def _to_device(array: np.ndarray, device: str):
+    """Wrap a uint8 array as a tensor on device, via pinned memory for CUDA."""
+    import torch
+    
+    tensor = torch.from_numpy(array)
+    if device == "cuda":
+        # Copy the uint8 frames (4x smaller than float) and convert on the GPU
+        tensor = tensor.pin_memory().to(device, non_blocking=True)
+    return tensor
+
+
+def _stage_pinned(frames_bgr: List[np.ndarray]):
+    """Stack same-shape frames into the reused pinned host buffer."""
+    global _pinned_batch
+    import torch
+    
+    shape = (len(frames_bgr),) + frames_bgr[0].shape
+    if _pinned_batch is None or tuple(_pinned_batch.shape) != shape:
+        _pinned_batch = torch.empty(shape, dtype=torch.uint8, pin_memory=True)
+    np.stack(frames_bgr, out=_pinned_batch.numpy())
+    return _pinned_batch
+
+
+def _model_input_scale(detector: Dict[str, Any], height: int, width: int) -> float:
+    """Scale the detector's own transform would resize a frame by, at most 1."""
+    transform = getattr(detector["model"], "transform", None)
+    if transform is None:
+        return 1.0
+    min_size = transform.min_size[-1]
+    return min(1.0, min_size / min(height, width), transform.max_size / max(height, width))
+
+
+def _downscale_for_model(frames_bgr: List[np.ndarray], detector: Dict[str, Any]):
+    """
+    Shrink frames to the detector's input size before they become tensors.
+    
+    The detector resizes to its min_size/max_size anyway; doing it here on
+    uint8 frames cuts the transfer and float conversion to the pixels the
+    model uses. Returns the frames and the per-frame scales applied.
+    """
+    small_frames, scales = [], []
+    for frame in frames_bgr:
+        height, width = frame.shape[:2]
+        scale = _model_input_scale(detector, height, width)
+        if scale < 1.0:
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
+            frame = cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+        small_frames.append(frame)
+        scales.append(scale)
+    return small_frames, scales
+
+
+def _frames_to_tensors(frames_bgr: List[np.ndarray], device: str = "cpu"):
+    """BGR uint8 HWC frames -> RGB float CHW tensors in [0, 1] on device."""
+    # Frames of one video share a size and convert as a single batch tensor
+    if len({frame.shape for frame in frames_bgr}) == 1:
+        if device == "cuda":
+            # Reading predictions back syncs the stream, so the copy out of
+            # the staging buffer is done before the next batch overwrites it
+            batch = _stage_pinned(frames_bgr).to(device, non_blocking=True)
+        else:
+            batch = _to_device(np.stack(frames_bgr), device)
+        return batch.permute(0, 3, 1, 2).flip(1).float().div_(255)
+        
+    return [
+        _to_device(frame, device).permute(2, 0, 1).flip(0).float().div_(255)
+        for frame in frames_bgr
+    ]
+
+
 def detect(frame_bgr: np.ndarray, score_threshold: float = 0.5) -> List[Dict[str, Any]]:
     """
     Detect objects in BGR frame.
     
     Returns list of detections: [{"bbox": [x, y, w, h], "conf": float, "label": str}, ...]
     """
-    if frame_bgr is None or frame_bgr.size == 0:
-        return []
+    return detect_batch([frame_bgr], score_threshold)[0]
+
+
+def _use_dedup() -> bool:
+    """Whether near-duplicate frames skip detection (INS_DEDUP=1)."""
+    return os.environ.get("INS_DEDUP", "0") == "1"
+
+
+def _frame_hash(frame_bgr: np.ndarray) -> int:
+    """64-bit perceptual hash: 8x8 luma thresholded at its median."""
+    gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (8, 8), interpolation=cv2.INTER_AREA)
+    return int(np.packbits(small > np.median(small)).view(">u8")[0])
+
+
+def _detect_batch_dedup(frames_bgr: List[np.ndarray], score_threshold: float) -> List[List[Dict[str, Any]]]:
+    """detect_batch that reuses detections for near-duplicate frames."""
+    results = [[] for _ in frames_bgr]
+    now = time.monotonic()
+    last_hash, cached = _dedup_state["hash"], _dedup_state["detections"]
+    if now - _dedup_state["time"] > DEDUP_MAX_AGE_SEC:
+        last_hash = None
+        
+    # Compare against the last frame actually detected, not the previous
+    # frame, so slow drift cannot chain matches indefinitely
+    source = [None] * len(frames_bgr)  # batch index to copy from, -1 for the cache
+    to_detect = []
+    last_source = -1
+    for i, frame in enumerate(frames_bgr):
+        if frame is None or frame.size == 0:
+            continue
+        frame_hash = _frame_hash(frame)
+        if last_hash is not None and (frame_hash ^ last_hash).bit_count() < DEDUP_HAMMING_THRESHOLD:
+            source[i] = last_source
+        else:
+            to_detect.append(i)
+            last_hash, last_source = frame_hash, i
+            
+    if to_detect:
+        detected = _detect_batch([frames_bgr[i] for i in to_detect], score_threshold)
+        for i, detections in zip(to_detect, detected):
+            results[i] = detections
+        _dedup_state.update(hash=last_hash, detections=results[last_source], time=now)
+        
+    for i, src in enumerate(source):
+        if src is not None:
+            results[i] = list(cached if src < 0 else results[src])
+    return results
+
+
+def detect_batch(frames_bgr: List[np.ndarray], score_threshold: float = 0.5) -> List[List[Dict[str, Any]]]:
+    """
+    Detect objects in several BGR frames with a single forward pass.
+    
+    Returns one detection list per frame, in the same format as detect().
+    """
+    if _use_dedup():
+        return _detect_batch_dedup(frames_bgr, score_threshold)
+    return _detect_batch(frames_bgr, score_threshold)
+
+
+def _detect_batch(frames_bgr: List[np.ndarray], score_threshold: float) -> List[List[Dict[str, Any]]]:
+    """Run the detector on every frame of a batch."""
+    if _use_trt():
+        from inscenium.perception.detect_trt import detect_batch_trt
+        results = detect_batch_trt(frames_bgr, score_threshold)
+        if results is not None:
+            return results
+        
+    results = [[] for _ in frames_bgr]
+    valid = [i for i, frame in enumerate(frames_bgr) if frame is not None and frame.size > 0]
+    if not valid:
+        return results
         
-    height, width = frame_bgr.shape[:2]
     detector = _get_detector()
-    
     if detector == "stub":
-        return []
+        return results
         
     try:
         import torch
         
-        # Convert BGR to RGB
-        frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
-        
-        # Transform and add batch dimension
-        input_tensor = detector["transform"](frame_rgb).unsqueeze(0)
+        device = detector["device"]
+        small_frames, scales = _downscale_for_model([frames_bgr[i] for i in valid], detector)
+        tensors = _frames_to_tensors(small_frames, device)
         
-        with torch.no_grad():
-            predictions = detector["model"](input_tensor)[0]
+        # FP16 autocast on GPU only, CPU stays in fp32
+        with torch.inference_mode(), torch.autocast(
+            device_type=device, dtype=torch.float16, enabled=device == "cuda"
+        ):
+            predictions = detector["model"](tensors)
+            
+        # Boxes come back in downscaled coordinates, clamp to the original frame
+        for i, frame_predictions, scale in zip(valid, predictions, scales):
+            height, width = frames_bgr[i].shape[:2]
+            results[i] = _predictions_to_detections(
+                frame_predictions, width, height, score_threshold, detector["classes"],
+                box_scale=1.0 / scale
+            )
             
-        detections = []
-        boxes = predictions["boxes"].cpu().numpy()
-        scores = predictions["scores"].cpu().numpy()
-        labels = predictions["labels"].cpu().numpy()
-        
-        for box, score, label in zip(boxes, scores, labels):
-            if score >= score_threshold:
-                x1, y1, x2, y2 = box
-                
-                # Clamp to image bounds
-                x1 = max(0, min(x1, width))
-                y1 = max(0, min(y1, height))
-                x2 = max(x1, min(x2, width))
-                y2 = max(y1, min(y2, height))
-                
-                # Convert to [x, y, w, h]
-                x, y, w, h = int(x1), int(y1), int(x2 - x1), int(y2 - y1)
-                
-                if w > 0 and h > 0:  # Valid bbox
-                    label_name = detector["classes"][label] if label < len(detector["classes"]) else f"class_{label}"
-                    detections.append({
-                        "bbox": [x, y, w, h],
-                        "conf": float(score),
-                        "label": label_name
-                    })
-                    
-        return detections
-        
     except Exception as e:
         logger.warning(f"Detection failed: {e}")
-        return []
-
-
-# Import cv2 if needed for color conversion
-try:
-    import cv2
-except ImportError:
-    logger.warning("opencv-python-headless not available")
-    cv2 = None
\ No newline at end of file
+        
+    return results
@@ -0,0 +1,147 @@
+"""TensorRT FP16 detection backend via ONNX Runtime.
+
+Selected with INS_BACKEND=trt (or the `trt` profile). The torchvision detector
+is exported to ONNX once per input size and run through ONNX Runtime's
+TensorRT execution provider, which builds and caches an FP16 engine. If no
+engine can be built, detection falls back to the torchvision path.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from inscenium.perception.detect import _get_detector, _arrays_to_detections, COCO_CLASSES
+
+logger = logging.getLogger(__name__)
+
+try:
+    import onnxruntime as ort
+    HAS_ORT = True
+except ImportError:
+    logger.warning("onnxruntime not available, TensorRT backend disabled")
+    HAS_ORT = False
+
+MODEL_NAME = "fasterrcnn_resnet50_fpn"
+ENGINE_CACHE_DIR = Path(os.environ.get("INS_ENGINE_CACHE", "~/.cache/inscenium/engines")).expanduser()
+
+# One session per input size, engines are shape-specialized
+_sessions: Dict[Tuple[int, int], Any] = {}
+
+# Set once an engine fails to build, detection then falls back to torchvision
+_disabled = False
+
+
+def trt_available() -> bool:
+    """Whether the TensorRT backend can be used in this process."""
+    return HAS_ORT and not _disabled
+
+
+def _engine_dir(height: int, width: int) -> Path:
+    """Cache directory for one model/input-size engine."""
+    return ENGINE_CACHE_DIR / f"{MODEL_NAME}_{height}x{width}_fp16"
+
+
+def _export_onnx(onnx_path: Path, height: int, width: int):
+    """Export the torchvision detector to ONNX for a fixed input size."""
+    import torch
+    
+    detector = _get_detector()
+    if detector == "stub":
+        raise RuntimeError("torchvision detector unavailable, cannot export ONNX")
+    
+    dummy = torch.zeros(3, height, width, device=detector["device"])
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    torch.onnx.export(
+        detector["model"],
+        ([dummy],),
+        str(onnx_path),
+        opset_version=11,
+        input_names=["image"],
+        output_names=["boxes", "labels", "scores"]
+    )
+    logger.info(f"Exported ONNX detector: {onnx_path}")
+
+
+def _get_session(height: int, width: int):
+    """Get or build the TensorRT session for an input size."""
+    session = _sessions.get((height, width))
+    if session is not None:
+        return session
+    
+    engine_dir = _engine_dir(height, width)
+    onnx_path = engine_dir / "model.onnx"
+    if not onnx_path.exists():
+        _export_onnx(onnx_path, height, width)
+    
+    providers = [
+        ("TensorrtExecutionProvider", {
+            "trt_fp16_enable": True,
+            "trt_engine_cache_enable": True,
+            "trt_engine_cache_path": str(engine_dir)
+        }),
+        "CUDAExecutionProvider",
+        "CPUExecutionProvider"
+    ]
+    session = ort.InferenceSession(str(onnx_path), providers=providers)
+    logger.info(f"Detection session for {width}x{height} using {session.get_providers()[0]}")
+    
+    _sessions[(height, width)] = session
+    return session
+
+
+def _preprocess(frame_bgr: np.ndarray) -> np.ndarray:
+    """BGR uint8 HWC -> RGB float32 CHW in [0, 1]."""
+    # Channel flip and transpose are views, the float cast is the only copy
+    chw = frame_bgr[:, :, ::-1].transpose(2, 0, 1).astype(np.float32)
+    chw *= 1.0 / 255.0
+    return chw
+
+
+def detect_trt(frame_bgr: np.ndarray, score_threshold: float = 0.5) -> Optional[List[Dict[str, Any]]]:
+    """
+    Detect objects in a BGR frame with the TensorRT engine.
+    
+    Returns None when no engine can be built, so the caller can fall back.
+    """
+    global _disabled
+    
+    if frame_bgr is None or frame_bgr.size == 0:
+        return []
+    if not trt_available():
+        return None
+    
+    height, width = frame_bgr.shape[:2]
+    
+    try:
+        session = _get_session(height, width)
+    except Exception as e:
+        logger.warning(f"TensorRT engine unavailable, falling back to torchvision: {e}")
+        _disabled = True
+        return None
+    
+    try:
+        boxes, labels, scores = session.run(None, {"image": _preprocess(frame_bgr)})
+        
+        return _arrays_to_detections(
+            boxes, scores, labels, width, height, score_threshold, COCO_CLASSES
+        )
+    
+    except Exception as e:
+        logger.warning(f"TensorRT detection failed: {e}")
+        return []
+
+
+def detect_batch_trt(frames_bgr: List[np.ndarray],
+                     score_threshold: float = 0.5) -> Optional[List[List[Dict[str, Any]]]]:
+    """Detect objects in several BGR frames, one engine call per frame, None to fall back."""
+    # The exported detector takes a single image, so frames run back to back
+    results = []
+    for frame in frames_bgr:
+        detections = detect_trt(frame, score_threshold)
+        if detections is None:
+            return None
+        results.append(detections)
+    return results
@@ -1,6 +1,8 @@
 """Video overlay rendering and thumbnail generation."""
 
+import functools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import numpy as np
@@ -14,6 +16,43 @@ except ImportError:
     logger.warning("opencv-python-headless not available for rendering")
     HAS_CV2 = False
 
+# Track labels use Hershey simplex at the renderer's font scale
+LABEL_THICKNESS = 1
+
+# HUD bar height in pixels (the bar covers rows 0..HUD_HEIGHT inclusive)
+HUD_HEIGHT = 80
+
+# Trail points kept per track, and frames a track may go unseen before its
+# trail is dropped
+TRAIL_LENGTH = 30
+TRAIL_MAX_IDLE_FRAMES = 90
+
+
+@functools.lru_cache(maxsize=None)
+def _draw_kernels():
+    """Import the compiled box kernels on first use, None without Numba."""
+    try:
+        from inscenium.render import draw_kernels
+        return draw_kernels
+    except ImportError as e:
+        logger.warning(f"numba not available, drawing boxes with cv2: {e}")
+        return None
+
+
+def _fill_rect(frame: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: tuple):
+    """Same pixels as a filled cv2.rectangle with inclusive corners, clipped to frame."""
+    x0, x1 = sorted((x0, x1))
+    y0, y1 = sorted((y0, y1))
+    frame[max(y0, 0):max(y1 + 1, 0), max(x0, 0):max(x1 + 1, 0)] = color
+
+
+def _outline_rect(frame: np.ndarray, x0: int, y0: int, x1: int, y1: int, color: tuple):
+    """Same pixels as a 1px cv2.rectangle border, as four edge slice writes."""
+    _fill_rect(frame, x0, y0, x1, y0, color)
+    _fill_rect(frame, x0, y1, x1, y1, color)
+    _fill_rect(frame, x0, y0, x0, y1, color)
+    _fill_rect(frame, x1, y0, x1, y1, color)
+
 
 class OverlayRenderer:
     """Render tracking overlays on video frames."""
@@ -25,8 +64,19 @@ class OverlayRenderer:
         self.hud = hud
         self.run_id = run_id
         self.profile = profile
-        self.track_trails = {}  # track_id -> list of centers
+        self.track_trails = {}  # track_id -> {"buf", "idx", "n", "seen"} center ring buffer
+        self._trail_frame = 0  # _draw_trails calls so far, for dropping idle trails
         self.colors = self._generate_colors()
+        self.colors_np = np.array(self.colors, dtype=np.uint8)  # (N, 3) color LUT
+        self._thumb_buf = None  # reused thumbnail resize output
+        self._io_pool = None  # thumbnail file writes, started on first thumbnail
+        self._hud_cache = None  # ((width, height), template, mask) of the static HUD
+        
+        # Import the box kernels here, Numba loading them would stall the first frame
+        if HAS_CV2:
+            _draw_kernels()
+        self._thumb_dirs = set()  # output dirs already created
+        self._label_metrics = None  # per-glyph advances, text height and baseline
         
     def _generate_colors(self) -> List[tuple]:
         """Generate distinct colors for tracks."""
@@ -43,19 +93,49 @@ class OverlayRenderer:
             (128, 128, 0),  # Olive
         ]
         
-        # Extend with more colors if needed
-        for i in range(len(colors), 50):
-            # Generate pseudo-random colors
-            np.random.seed(i)
-            color = tuple(np.random.randint(0, 256, 3).tolist())
-            colors.append(color)
+        # Extend with pseudo-random colors from a local generator, one draw
+        # for all of them and the global NumPy RNG left untouched
+        rng = np.random.default_rng(0)
+        extra = rng.integers(0, 256, size=(50 - len(colors), 3)).tolist()
+        colors.extend(tuple(color) for color in extra)
             
         return colors
         
     def _get_track_color(self, track_id: int) -> tuple:
         """Get consistent color for track ID."""
+        # Plain tuples index faster than the LUT for a single track
         return self.colors[track_id % len(self.colors)]
         
+    def _get_track_colors(self, track_ids: np.ndarray) -> np.ndarray:
+        """Colors for many track IDs at once, as (N, 3) uint8 rows of the LUT."""
+        return self.colors_np[np.asarray(track_ids) % len(self.colors_np)]
+        
+    def _label_text_size(self, text: str) -> tuple:
+        """
+        cv2.getTextSize for track labels, from cached glyph advances.
+        
+        Hershey text width is the sum of each glyph's advance times the font
+        scale, rounded after adding the thickness; height and baseline do not
+        depend on the text. Summing in the same order gives identical sizes.
+        """
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        if self._label_metrics is None:
+            # A 100-glyph run makes the integer advance exact after rounding
+            advances = {
+                chr(c): (cv2.getTextSize(chr(c) * 100, font, 1.0, LABEL_THICKNESS)[0][0]
+                         - LABEL_THICKNESS) / 100 * self.font_scale
+                for c in range(32, 127)
+            }
+            (_, text_h), baseline = cv2.getTextSize(" ", font, self.font_scale, LABEL_THICKNESS)
+            self._label_metrics = (advances, text_h, baseline)
+            
+        advances, text_h, baseline = self._label_metrics
+        try:
+            text_w = round(sum(advances[ch] for ch in text) + LABEL_THICKNESS)
+        except KeyError:
+            return cv2.getTextSize(text, font, self.font_scale, LABEL_THICKNESS)
+        return (text_w, text_h), baseline
+        
     def _draw_bbox(self, frame: np.ndarray, track: Dict[str, Any]) -> np.ndarray:
         """Draw bounding box and label for track."""
         if not HAS_CV2:
@@ -76,10 +156,10 @@ class OverlayRenderer:
             # Draw label and info
             text = f"ID:{track_id} {label} {conf:.2f}"
             font = cv2.FONT_HERSHEY_SIMPLEX
-            thickness = 1
+            thickness = LABEL_THICKNESS
             
             # Get text size for background
-            (text_w, text_h), baseline = cv2.getTextSize(text, font, self.font_scale, thickness)
+            (text_w, text_h), baseline = self._label_text_size(text)
             
             # Draw text background
             cv2.rectangle(frame, (x, y - text_h - 10), (x + text_w, y), color, -1)
@@ -93,6 +173,40 @@ class OverlayRenderer:
             logger.warning(f"Failed to draw bbox: {e}")
             return frame
             
+    def _draw_bboxes(self, frame: np.ndarray, tracks: List[Dict[str, Any]]) -> np.ndarray:
+        """Draw all tracks' boxes and labels, borders in one compiled kernel call."""
+        kernels = _draw_kernels() if HAS_CV2 else None
+        if (kernels is None or frame.dtype != np.uint8 or frame.ndim != 3
+                or frame.shape[2] != 3 or not frame.flags["C_CONTIGUOUS"]):
+            for track in tracks:
+                frame = self._draw_bbox(frame, track)
+            return frame
+            
+        try:
+            boxes = np.empty((len(tracks), 4), dtype=np.int32)
+            label_rects = np.empty((len(tracks), 4), dtype=np.int32)
+            labels = []
+            for i, track in enumerate(tracks):
+                x, y, w, h = track["bbox"]
+                text = f"ID:{track['id']} {track.get('label', 'object')} {track.get('conf', 0.0):.2f}"
+                (text_w, text_h), _ = self._label_text_size(text)
+                boxes[i] = (x, y, x + w, y + h)
+                label_rects[i] = (x, y - text_h - 10, x + text_w, y)
+                labels.append((text, (x, y - 5)))
+                
+            colors = self._get_track_colors([track["id"] for track in tracks])
+            kernels.draw_boxes(frame, boxes, colors, label_rects)
+            
+            # Text goes on after all boxes, so no box covers another's label
+            for text, origin in labels:
+                cv2.putText(frame, text, origin, cv2.FONT_HERSHEY_SIMPLEX,
+                            self.font_scale, (255, 255, 255), LABEL_THICKNESS)
+            return frame
+            
+        except Exception as e:
+            logger.warning(f"Failed to draw bboxes: {e}")
+            return frame
+            
     def _draw_uaor_bars(self, frame: np.ndarray, uaor_scores: Dict[str, float]) -> np.ndarray:
         """Draw UAOR mini-bars in corner."""
         if not HAS_CV2:
@@ -104,27 +218,24 @@ class OverlayRenderer:
             bar_height = 10
             margin = 10
             
-            # Occlusion bar (red)
+            x0 = w - bar_width - margin
+            white = (255, 255, 255)
+            
+            # Occlusion bar (red), fill and border as slice writes
             occlusion = uaor_scores.get("occlusion", 0.0)
             occ_len = int(bar_width * occlusion)
-            cv2.rectangle(frame, (w - bar_width - margin, margin), 
-                         (w - bar_width - margin + occ_len, margin + bar_height), 
-                         (0, 0, 255), -1)
-            cv2.rectangle(frame, (w - bar_width - margin, margin), 
-                         (w - margin, margin + bar_height), (255, 255, 255), 1)
-            cv2.putText(frame, "Occ", (w - bar_width - margin, margin + bar_height + 15), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, (255, 255, 255), 1)
+            _fill_rect(frame, x0, margin, x0 + occ_len, margin + bar_height, (0, 0, 255))
+            _outline_rect(frame, x0, margin, w - margin, margin + bar_height, white)
+            cv2.putText(frame, "Occ", (x0, margin + bar_height + 15), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, white, 1)
             
             # Uncertainty bar (yellow)
             uncertainty = uaor_scores.get("uncertainty", 0.0)
             unc_len = int(bar_width * uncertainty)
-            cv2.rectangle(frame, (w - bar_width - margin, margin + 25), 
-                         (w - bar_width - margin + unc_len, margin + 25 + bar_height), 
-                         (0, 255, 255), -1)
-            cv2.rectangle(frame, (w - bar_width - margin, margin + 25), 
-                         (w - margin, margin + 25 + bar_height), (255, 255, 255), 1)
-            cv2.putText(frame, "Unc", (w - bar_width - margin, margin + 25 + bar_height + 15), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, (255, 255, 255), 1)
+            _fill_rect(frame, x0, margin + 25, x0 + unc_len, margin + 25 + bar_height, (0, 255, 255))
+            _outline_rect(frame, x0, margin + 25, w - margin, margin + 25 + bar_height, white)
+            cv2.putText(frame, "Unc", (x0, margin + 25 + bar_height + 15), 
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.3, white, 1)
                        
             return frame
             
@@ -138,27 +249,40 @@ class OverlayRenderer:
             return frame
             
         try:
+            self._trail_frame += 1
             for track in tracks:
                 track_id = track["id"]
                 bbox = track["bbox"]
                 
-                # Update trail
-                center = (bbox[0] + bbox[2]//2, bbox[1] + bbox[3]//2)
-                if track_id not in self.track_trails:
-                    self.track_trails[track_id] = []
+                # Update trail, the ring buffer overwrites the oldest center
+                trail = self.track_trails.get(track_id)
+                if trail is None:
+                    trail = self.track_trails[track_id] = {
+                        "buf": np.empty((TRAIL_LENGTH, 2), dtype=np.int32), "idx": 0, "n": 0
+                    }
+                buf, idx = trail["buf"], trail["idx"]
+                buf[idx] = (bbox[0] + bbox[2]//2, bbox[1] + bbox[3]//2)
+                trail["idx"] = (idx + 1) % TRAIL_LENGTH
+                trail["n"] = min(trail["n"] + 1, TRAIL_LENGTH)
+                trail["seen"] = self._trail_frame
                     
-                self.track_trails[track_id].append(center)
-                
-                # Keep only recent trail points
-                if len(self.track_trails[track_id]) > 30:
-                    self.track_trails[track_id] = self.track_trails[track_id][-30:]
-                    
-                # Draw trail
-                if len(self.track_trails[track_id]) > 1:
+                # Draw trail, oldest point first
+                n = trail["n"]
+                if n > 1:
                     color = self._get_track_color(track_id)
-                    points = np.array(self.track_trails[track_id], dtype=np.int32)
+                    if n < TRAIL_LENGTH:
+                        points = buf[:n]
+                    else:
+                        points = np.concatenate((buf[trail["idx"]:], buf[:trail["idx"]]))
                     cv2.polylines(frame, [points], False, color, 1)
                     
+            # Forget tracks that have not been seen for a while
+            if self._trail_frame % TRAIL_MAX_IDLE_FRAMES == 0:
+                self.track_trails = {
+                    track_id: trail for track_id, trail in self.track_trails.items()
+                    if self._trail_frame - trail["seen"] < TRAIL_MAX_IDLE_FRAMES
+                }
+                    
             return frame
             
         except Exception as e:
@@ -166,17 +290,33 @@ class OverlayRenderer:
             return frame
             
     def render_frame(self, frame: np.ndarray, tracks: List[Dict[str, Any]], 
-                    uaor_scores: Dict[str, float]) -> np.ndarray:
-        """Render complete overlay on frame."""
+                    uaor_scores: Dict[str, float], *, inplace: bool = False) -> np.ndarray:
+        """
+        Render complete overlay on frame.
+        
+        With inplace=True the overlay is drawn straight onto frame, for callers
+        that own the buffer and no longer need the clean image.
+        """
         if frame is None:
             return frame
             
-        # Make a copy to avoid modifying original
-        overlay_frame = frame.copy()
+        if inplace:
+            return self._draw_overlay(frame, tracks, uaor_scores)
+        return self.render_frame_into(np.empty_like(frame), frame, tracks, uaor_scores)
         
+    def render_frame_into(self, dst: np.ndarray, frame: np.ndarray, tracks: List[Dict[str, Any]],
+                          uaor_scores: Dict[str, float]) -> np.ndarray:
+        """Render overlay into a caller-owned buffer shaped like frame, returns dst."""
+        # Copy into dst and draw there, the original frame stays untouched
+        np.copyto(dst, frame)
+        return self._draw_overlay(dst, tracks, uaor_scores)
+        
+    def _draw_overlay(self, overlay_frame: np.ndarray, tracks: List[Dict[str, Any]],
+                      uaor_scores: Dict[str, float]) -> np.ndarray:
+        """Draw all overlay layers onto overlay_frame in place."""
         # Draw track bboxes and labels
-        for track in tracks:
-            overlay_frame = self._draw_bbox(overlay_frame, track)
+        if tracks:
+            overlay_frame = self._draw_bboxes(overlay_frame, tracks)
             
         # Draw trails
         overlay_frame = self._draw_trails(overlay_frame, tracks)
@@ -190,6 +330,45 @@ class OverlayRenderer:
         
         return overlay_frame
         
+    def _hud_template(self, w: int, strip_h: int) -> tuple:
+        """Static HUD pixels and the mask of pixels they cover, for a bar size."""
+        if self._hud_cache is None or self._hud_cache[0] != (w, strip_h):
+            # Drawn on black and on white, pixels that agree are the drawn ones
+            canvases = [np.full((strip_h, w, 3), fill, dtype=np.uint8) for fill in (0, 255)]
+            for canvas in canvases:
+                self._draw_hud_static(canvas)
+            mask = np.all(canvases[0] == canvases[1], axis=2)
+            self._hud_cache = ((w, strip_h), canvases[0], mask)
+        return self._hud_cache[1], self._hud_cache[2]
+        
+    def _draw_hud_static(self, frame: np.ndarray):
+        """Draw the HUD text and legend that do not change between frames."""
+        w = frame.shape[1]
+        
+        # App name and version
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        
+        # Title
+        cv2.putText(frame, "Inscenium v1.0.0", (10, 25), font, 0.6, (255, 255, 255), 2)
+        
+        # Run ID (short)
+        run_text = f"Run: {self.run_id[:8] if self.run_id else 'N/A'}"
+        cv2.putText(frame, run_text, (10, 45), font, 0.4, (200, 200, 200), 1)
+        
+        # Profile
+        profile_text = f"Profile: {self.profile}"
+        cv2.putText(frame, profile_text, (10, 65), font, 0.4, (200, 200, 200), 1)
+        
+        # Simple legend for track colors
+        legend_y = 45
+        cv2.putText(frame, "Tracks:", (w - 120, legend_y), font, 0.3, (200, 200, 200), 1)
+        
+        # Draw small colored squares for first few track colors
+        for i, color in enumerate(self.colors[:5]):
+            if i * 15 + (w - 80) < w - 10:
+                cv2.rectangle(frame, (w - 80 + i * 15, legend_y + 5), 
+                            (w - 70 + i * 15, legend_y + 15), color, -1)
+        
     def _draw_hud(self, frame: np.ndarray) -> np.ndarray:
         """Draw HUD overlay with app info."""
         if not HAS_CV2:
@@ -199,41 +378,19 @@ class OverlayRenderer:
             from datetime import datetime
             h, w = frame.shape[:2]
             
-            # HUD background
-            hud_height = 80
-            overlay = frame.copy()
-            cv2.rectangle(overlay, (0, 0), (w, hud_height), (0, 0, 0), -1)
-            cv2.addWeighted(frame, 0.7, overlay, 0.3, 0, frame)
+            # Darken the bar (the old 30% black blend), then stamp the static
+            # text and legend from a template built once per frame width
+            strip = frame[:HUD_HEIGHT + 1]
+            cv2.addWeighted(strip, 0.7, strip, 0.0, 0.0, dst=strip)
+            template, mask = self._hud_template(w, strip.shape[0])
+            np.copyto(strip, template, where=mask[..., None])
             
-            # App name and version
+            # Timestamp (right side), the only part that changes
             font = cv2.FONT_HERSHEY_SIMPLEX
-            
-            # Title
-            cv2.putText(frame, "Inscenium v1.0.0", (10, 25), font, 0.6, (255, 255, 255), 2)
-            
-            # Run ID (short)
-            run_text = f"Run: {self.run_id[:8] if self.run_id else 'N/A'}"
-            cv2.putText(frame, run_text, (10, 45), font, 0.4, (200, 200, 200), 1)
-            
-            # Profile
-            profile_text = f"Profile: {self.profile}"
-            cv2.putText(frame, profile_text, (10, 65), font, 0.4, (200, 200, 200), 1)
-            
-            # Timestamp (right side)
             timestamp = datetime.now().strftime("%H:%M:%S")
             timestamp_size = cv2.getTextSize(timestamp, font, 0.5, 1)[0]
             cv2.putText(frame, timestamp, (w - timestamp_size[0] - 10, 25), font, 0.5, (255, 255, 255), 1)
             
-            # Simple legend for track colors
-            legend_y = 45
-            cv2.putText(frame, "Tracks:", (w - 120, legend_y), font, 0.3, (200, 200, 200), 1)
-            
-            # Draw small colored squares for first few track colors
-            for i, color in enumerate(self.colors[:5]):
-                if i * 15 + (w - 80) < w - 10:
-                    cv2.rectangle(frame, (w - 80 + i * 15, legend_y + 5), 
-                                (w - 70 + i * 15, legend_y + 15), color, -1)
-            
             return frame
             
         except Exception as e:
@@ -248,14 +405,43 @@ class OverlayRenderer:
             
         try:
             output_dir = Path(output_dir)
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Resize frame
-            thumb = cv2.resize(frame, size)
-            
-            # Save as JPG
+            if output_dir not in self._thumb_dirs:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                self._thumb_dirs.add(output_dir)
+            
+            # Resize frame into a reused buffer
+            if self._thumb_buf is None or self._thumb_buf.shape[:2] != (size[1], size[0]) \
+                    or self._thumb_buf.shape[2:] != frame.shape[2:]:
+                self._thumb_buf = np.empty((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+            # Area averaging when shrinking (sharper and cheaper), linear to enlarge
+            interpolation = cv2.INTER_AREA if frame.shape[1] >= size[0] else cv2.INTER_LINEAR
+            thumb = cv2.resize(frame, size, dst=self._thumb_buf, interpolation=interpolation)
+            
+            # Encode here (imwrite's default quality), the resize buffer is reused
+            # by the next thumbnail
+            ok, jpeg = cv2.imencode(".jpg", thumb, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            if not ok:
+                raise RuntimeError("JPEG encoding failed")
+            
+            # The file write happens off the render thread
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ins-thumbs")
             thumb_path = output_dir / f"frame_{frame_idx:06d}.jpg"
-            cv2.imwrite(str(thumb_path), thumb)
+            self._io_pool.submit(self._write_thumbnail, thumb_path, jpeg)
+            
+        except Exception as e:
+            logger.warning(f"Failed to save thumbnail: {e}")
             
+    @staticmethod
+    def _write_thumbnail(path: Path, jpeg: np.ndarray):
+        """Write encoded thumbnail bytes, on the I/O pool."""
+        try:
+            path.write_bytes(jpeg.data)
         except Exception as e:
-            logger.warning(f"Failed to save thumbnail: {e}")
\ No newline at end of file
+            logger.warning(f"Failed to write thumbnail {path}: {e}")
+            
+    def close(self):
+        """Wait for pending thumbnail writes."""
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
\ No newline at end of file
@@ -1,124 +1,35 @@
 """HTML report generator for pipeline runs."""
 
 import json
+import mmap
+import os
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
-def generate_sparkline_svg(values: List[float], width: int = 100, height: int = 20) -> str:
-    """Generate simple SVG sparkline from values."""
-    if not values or len(values) < 2:
-        return f'<svg width="{width}" height="{height}"></svg>'
-    
-    min_val = min(values)
-    max_val = max(values)
-    val_range = max_val - min_val if max_val > min_val else 1
-    
-    points = []
-    for i, val in enumerate(values):
-        x = (i / (len(values) - 1)) * width
-        y = height - ((val - min_val) / val_range) * height
-        points.append(f"{x:.1f},{y:.1f}")
-    
-    path = " ".join(points)
-    
-    return f'''
-    <svg width="{width}" height="{height}" style="display: inline-block;">
-        <polyline points="{path}" 
-                  fill="none" 
-                  stroke="#2563eb" 
-                  stroke-width="1.5"/>
-    </svg>
-    '''
-
-
-def load_run_data(run_dir: Path) -> Optional[Dict[str, Any]]:
-    """Load run metadata and metrics."""
-    run_json = run_dir / "run.json"
-    metrics_json = run_dir / "metrics.json"
-    
-    if not run_json.exists():
-        return None
-        
-    try:
-        with open(run_json, 'r') as f:
-            run_data = json.load(f)
-            
-        if metrics_json.exists():
-            with open(metrics_json, 'r') as f:
-                metrics_data = json.load(f)
-            run_data["metrics"] = metrics_data
-        else:
-            run_data["metrics"] = {}
-            
-        return run_data
-    except Exception:
-        return None
+# Threads reading run.json/metrics.json for the index page
+LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
+# Smaller run files are read outright, mapping them costs more than the copy
+MMAP_MIN_BYTES = 8192
 
-def get_thumbnail_gallery(run_dir: Path) -> str:
-    """Generate thumbnail gallery HTML."""
-    thumbs_dir = run_dir / "thumbs"
-    if not thumbs_dir.exists():
-        return "<p>No thumbnails available</p>"
-        
-    thumbnails = list(thumbs_dir.glob("*.jpg"))[:12]  # Limit to 12 thumbs
-    if not thumbnails:
-        return "<p>No thumbnails available</p>"
-        
-    gallery_html = '<div class="thumbnail-gallery">'
-    for thumb in sorted(thumbnails):
-        rel_path = f"thumbs/{thumb.name}"
-        gallery_html += f'''
-        <div class="thumbnail">
-            <img src="{rel_path}" alt="{thumb.stem}" loading="lazy">
-            <div class="thumbnail-label">{thumb.stem}</div>
-        </div>
-        '''
-    gallery_html += '</div>'
-    
-    return gallery_html
+# Pages are streamed to disk through a buffer of this size
+WRITE_BUFFER_BYTES = 1 << 16
 
+# Relative shape of the mock per-stage latency timeline in run reports
+MOCK_TIMELINE = [0.8 + 0.4 * (i % 3) / 3 for i in range(10)]
 
-def generate_run_report_html(run_data: Dict[str, Any], run_dir: Path) -> str:
-    """Generate HTML report for a single run."""
-    
-    # Extract key metrics
-    run_id = run_data.get("run_id", "unknown")
-    profile = run_data.get("profile", "unknown")
-    duration = run_data.get("duration_sec", 0)
-    frames = run_data.get("frames_processed", 0)
-    
-    metrics = run_data.get("metrics", {})
-    avg_fps = metrics.get("avg_fps", 0)
-    stage_latencies = metrics.get("stage_latencies", {})
-    
-    # Check for overlay video
-    overlay_path = run_dir / "overlay.mp4"
-    overlay_link = ""
-    if overlay_path.exists():
-        overlay_link = f'<p><a href="overlay.mp4" class="video-link">📹 View Overlay Video</a></p>'
-    
-    # Generate thumbnail gallery
-    gallery_html = get_thumbnail_gallery(run_dir)
-    
-    # Generate stage latency sparklines (mock data for demo)
-    stage_charts = ""
-    for stage, latency in stage_latencies.items():
-        # Create mock timeline for sparkline
-        mock_values = [latency * (0.8 + 0.4 * (i % 3) / 3) for i in range(10)]
-        sparkline = generate_sparkline_svg(mock_values)
-        stage_charts += f'''
-        <tr>
-            <td>{stage.title()}</td>
-            <td>{latency*1000:.1f}ms</td>
-            <td>{sparkline}</td>
-        </tr>
-        '''
-    
-    html_content = f'''
+# Page templates are split around the static CSS so the stylesheet is a
+# plain constant and only the variable parts go through str.format
+_RUN_REPORT_HEAD = '''
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -126,85 +37,87 @@ def generate_run_report_html(run_data: Dict[str, Any], run_dir: Path) -> str:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Inscenium Run Report - {run_id}</title>
     <style>
-        body {{
+'''
+
+_RUN_REPORT_CSS = '''        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             max-width: 1200px;
             margin: 0 auto;
             padding: 20px;
             background-color: #f8fafc;
             color: #1e293b;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #3b82f6, #8b5cf6);
             color: white;
             padding: 2rem;
             border-radius: 12px;
             margin-bottom: 2rem;
             text-align: center;
-        }}
-        .header h1 {{ margin: 0 0 0.5rem 0; font-size: 2.5rem; }}
-        .header p {{ margin: 0; opacity: 0.9; font-size: 1.1rem; }}
+        }
+        .header h1 { margin: 0 0 0.5rem 0; font-size: 2.5rem; }
+        .header p { margin: 0; opacity: 0.9; font-size: 1.1rem; }
         
-        .metrics-grid {{
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1rem;
             margin-bottom: 2rem;
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background: white;
             padding: 1.5rem;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             text-align: center;
-        }}
-        .metric-value {{
+        }
+        .metric-value {
             font-size: 2rem;
             font-weight: bold;
             color: #3b82f6;
             margin-bottom: 0.5rem;
-        }}
-        .metric-label {{
+        }
+        .metric-label {
             color: #64748b;
             font-size: 0.9rem;
             text-transform: uppercase;
             letter-spacing: 0.05em;
-        }}
+        }
         
-        .section {{
+        .section {
             background: white;
             margin-bottom: 2rem;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
-        .section-header {{
+        }
+        .section-header {
             background: #f1f5f9;
             padding: 1rem 1.5rem;
             font-weight: 600;
             color: #334155;
             border-bottom: 1px solid #e2e8f0;
-        }}
-        .section-content {{
+        }
+        .section-content {
             padding: 1.5rem;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 0.75rem;
             text-align: left;
             border-bottom: 1px solid #e2e8f0;
-        }}
-        th {{
+        }
+        th {
             background: #f8fafc;
             font-weight: 600;
             color: #374151;
-        }}
+        }
         
-        .video-link {{
+        .video-link {
             display: inline-block;
             background: #3b82f6;
             color: white;
@@ -213,41 +126,44 @@ def generate_run_report_html(run_data: Dict[str, Any], run_dir: Path) -> str:
             border-radius: 6px;
             font-weight: 500;
             transition: background-color 0.2s;
-        }}
-        .video-link:hover {{
+        }
+        .video-link:hover {
             background: #2563eb;
-        }}
+        }
         
-        .thumbnail-gallery {{
+        .thumbnail-gallery {
             display: grid;
             grid-template-columns: repeat(auto-fill, minmax(150px, 1fr));
             gap: 1rem;
-        }}
-        .thumbnail {{
+        }
+        .thumbnail {
             text-align: center;
-        }}
-        .thumbnail img {{
+        }
+        .thumbnail img {
             width: 100%;
             height: 100px;
             object-fit: cover;
             border-radius: 6px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .thumbnail-label {{
+        }
+        .thumbnail-label {
             margin-top: 0.5rem;
             font-size: 0.8rem;
             color: #64748b;
-        }}
+        }
         
-        .footer {{
+        .footer {
             text-align: center;
             padding: 2rem;
             color: #64748b;
             font-size: 0.9rem;
-        }}
-    </style>
+        }
+'''
+
+_RUN_REPORT_BODY = '''    </style>
 </head>
 <body>
+    {sparkline_sprite}
     <div class="header">
         <h1>🎬 Inscenium Pipeline Report</h1>
         <p>Run ID: {run_id} | Profile: {profile}</p>
@@ -286,7 +202,9 @@ def generate_run_report_html(run_data: Dict[str, Any], run_dir: Path) -> str:
                     </tr>
                 </thead>
                 <tbody>
-                    {stage_charts}
+                    '''
+
+_RUN_REPORT_GALLERY = '''
                 </tbody>
             </table>
         </div>
@@ -295,59 +213,20 @@ def generate_run_report_html(run_data: Dict[str, Any], run_dir: Path) -> str:
     <div class="section">
         <div class="section-header">Thumbnail Gallery</div>
         <div class="section-content">
-            {gallery_html}
+            '''
+
+_RUN_REPORT_FOOTER = '''
         </div>
     </div>
     
     <div class="footer">
-        Generated by Inscenium v1.0.0 at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        Generated by Inscenium v1.0.0 at {generated_at}
     </div>
 </body>
 </html>
     '''
-    
-    return html_content
 
-
-def generate_index_html(runs_data: List[Dict[str, Any]], runs_dir: Path) -> str:
-    """Generate index.html with links to all run reports."""
-    
-    runs_table = ""
-    for run_data in sorted(runs_data, key=lambda x: x.get("start_time", ""), reverse=True):
-        run_id = run_data.get("run_id", "unknown")
-        profile = run_data.get("profile", "unknown")
-        frames = run_data.get("frames_processed", 0)
-        duration = run_data.get("duration_sec", 0)
-        start_time = run_data.get("start_time", "")
-        
-        # Format start time
-        try:
-            dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-            formatted_time = dt.strftime("%Y-%m-%d %H:%M")
-        except:
-            formatted_time = start_time[:16] if start_time else "Unknown"
-        
-        # Check for files
-        run_dir = runs_dir / run_id
-        has_report = (run_dir / "report.html").exists()
-        has_video = (run_dir / "overlay.mp4").exists()
-        
-        report_link = f'<a href="{run_id}/report.html">📊 Report</a>' if has_report else "No report"
-        video_link = f'<a href="{run_id}/overlay.mp4">🎥 Video</a>' if has_video else "No video"
-        
-        runs_table += f'''
-        <tr>
-            <td><strong>{run_id}</strong></td>
-            <td>{formatted_time}</td>
-            <td>{profile}</td>
-            <td>{frames:,}</td>
-            <td>{duration:.1f}s</td>
-            <td>{report_link}</td>
-            <td>{video_link}</td>
-        </tr>
-        '''
-    
-    html_content = f'''
+_INDEX_HEAD = '''
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -355,76 +234,80 @@ def generate_index_html(runs_data: List[Dict[str, Any]], runs_dir: Path) -> str:
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Inscenium Runs Gallery</title>
     <style>
-        body {{
+'''
+
+_INDEX_CSS = '''        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             max-width: 1400px;
             margin: 0 auto;
             padding: 20px;
             background-color: #f8fafc;
             color: #1e293b;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #3b82f6, #8b5cf6);
             color: white;
             padding: 2rem;
             border-radius: 12px;
             margin-bottom: 2rem;
             text-align: center;
-        }}
-        .header h1 {{ margin: 0; font-size: 2.5rem; }}
+        }
+        .header h1 { margin: 0; font-size: 2.5rem; }
         
-        .section {{
+        .section {
             background: white;
             margin-bottom: 2rem;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
-        .section-header {{
+        }
+        .section-header {
             background: #f1f5f9;
             padding: 1rem 1.5rem;
             font-weight: 600;
             color: #334155;
             border-bottom: 1px solid #e2e8f0;
-        }}
-        .section-content {{
+        }
+        .section-content {
             padding: 0;
-        }}
+        }
         
-        table {{
+        table {
             width: 100%;
             border-collapse: collapse;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 1rem;
             text-align: left;
             border-bottom: 1px solid #e2e8f0;
-        }}
-        th {{
+        }
+        th {
             background: #f8fafc;
             font-weight: 600;
             color: #374151;
             position: sticky;
             top: 0;
-        }}
+        }
         
-        a {{
+        a {
             color: #3b82f6;
             text-decoration: none;
             font-weight: 500;
-        }}
-        a:hover {{
+        }
+        a:hover {
             color: #2563eb;
             text-decoration: underline;
-        }}
+        }
         
-        .footer {{
+        .footer {
             text-align: center;
             padding: 2rem;
             color: #64748b;
             font-size: 0.9rem;
-        }}
-    </style>
+        }
+'''
+
+_INDEX_BODY = '''    </style>
 </head>
 <body>
     <div class="header">
@@ -447,20 +330,249 @@ def generate_index_html(runs_data: List[Dict[str, Any]], runs_dir: Path) -> str:
                     </tr>
                 </thead>
                 <tbody>
-                    {runs_table}
+                    '''
+
+_INDEX_FOOTER = '''
                 </tbody>
             </table>
         </div>
     </div>
     
     <div class="footer">
-        Generated by Inscenium v1.0.0 at {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        Generated by Inscenium v1.0.0 at {generated_at}
     </div>
 </body>
 </html>
     '''
+
+
+def _sparkline_points(values: List[float], width: int = 100, height: int = 20) -> str:
+    """Polyline points scaling values into a width x height box."""
+    min_val = min(values)
+    max_val = max(values)
+    val_range = max_val - min_val if max_val > min_val else 1
+    
+    points = []
+    for i, val in enumerate(values):
+        x = (i / (len(values) - 1)) * width
+        y = height - ((val - min_val) / val_range) * height
+        points.append(f"{x:.1f},{y:.1f}")
+    
+    return " ".join(points)
+
+
+def generate_sparkline_svg(values: List[float], width: int = 100, height: int = 20) -> str:
+    """Generate simple SVG sparkline from values."""
+    if not values or len(values) < 2:
+        return f'<svg width="{width}" height="{height}"></svg>'
+    
+    path = _sparkline_points(values, width, height)
+    
+    return f'''
+    <svg width="{width}" height="{height}" style="display: inline-block;">
+        <polyline points="{path}" 
+                  fill="none" 
+                  stroke="#2563eb" 
+                  stroke-width="1.5"/>
+    </svg>
+    '''
+
+
+def _sparkline_sprite(symbols: Dict[str, str], width: int = 100, height: int = 20) -> str:
+    """Hidden SVG defining one <symbol> per sparkline, keyed points -> id."""
+    if not symbols:
+        return ""
+    defs = "".join(
+        f'''
+        <symbol id="{symbol_id}" viewBox="0 0 {width} {height}">
+            <polyline points="{points}" fill="none" stroke="#2563eb" stroke-width="1.5"/>
+        </symbol>'''
+        for points, symbol_id in symbols.items()
+    )
+    return f'<svg width="0" height="0" style="position: absolute;">{defs}\n    </svg>'
+
+
+def _load_json(path: Path) -> Any:
+    """
+    Parse a JSON file, handing the raw bytes to orjson when available.
+    
+    orjson parses files of MMAP_MIN_BYTES and up straight from a read-only
+    mapping, skipping the copy into a bytes object.
+    """
+    with open(path, 'rb') as f:
+        if HAS_ORJSON and os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    return orjson.loads(view)
+            except OSError:
+                pass  # not mappable, read it instead
+        data = f.read()
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_run_data(run_dir: Path) -> Optional[Dict[str, Any]]:
+    """Load run metadata and metrics."""
+    run_json = run_dir / "run.json"
+    metrics_json = run_dir / "metrics.json"
+    
+    if not run_json.exists():
+        return None
+        
+    try:
+        run_data = _load_json(run_json)
+        
+        if metrics_json.exists():
+            run_data["metrics"] = _load_json(metrics_json)
+        else:
+            run_data["metrics"] = {}
+            
+        return run_data
+    except Exception:
+        return None
+
+
+def get_thumbnail_gallery(run_dir: Path) -> str:
+    """Generate thumbnail gallery HTML."""
+    thumbs_dir = run_dir / "thumbs"
+    if not thumbs_dir.exists():
+        return "<p>No thumbnails available</p>"
+        
+    thumbnails = list(thumbs_dir.glob("*.jpg"))[:12]  # Limit to 12 thumbs
+    if not thumbnails:
+        return "<p>No thumbnails available</p>"
+        
+    # Fixed dimensions reserve the layout before decode, which runs off the main thread
+    gallery_html = ['<div class="thumbnail-gallery">']
+    for thumb in sorted(thumbnails):
+        rel_path = f"thumbs/{thumb.name}"
+        gallery_html.append(f'''
+        <div class="thumbnail">
+            <img src="{rel_path}" alt="{thumb.stem}" loading="lazy" decoding="async" width="150" height="100">
+            <div class="thumbnail-label">{thumb.stem}</div>
+        </div>
+        ''')
+    gallery_html.append('</div>')
+    
+    return "".join(gallery_html)
+
+
+def generate_run_report_html(run_data: Dict[str, Any], run_dir: Path) -> str:
+    """Generate HTML report for a single run."""
+    return "".join(generate_run_report_html_stream(run_data, run_dir))
+
+
+def generate_run_report_html_stream(run_data: Dict[str, Any], run_dir: Path) -> Iterator[str]:
+    """Yield the HTML report for a single run in chunks, for writelines()."""
+    
+    # Extract key metrics
+    run_id = run_data.get("run_id", "unknown")
+    profile = run_data.get("profile", "unknown")
+    duration = run_data.get("duration_sec", 0)
+    frames = run_data.get("frames_processed", 0)
+    
+    metrics = run_data.get("metrics", {})
+    avg_fps = metrics.get("avg_fps", 0)
+    stage_latencies = metrics.get("stage_latencies", {})
+    
+    # Check for overlay video
+    overlay_path = run_dir / "overlay.mp4"
+    overlay_link = ""
+    if overlay_path.exists():
+        overlay_link = f'<p><a href="overlay.mp4" class="video-link">📹 View Overlay Video</a></p>'
+    
+    # Generate thumbnail gallery
+    gallery_html = get_thumbnail_gallery(run_dir)
+    
+    # Generate stage latency sparklines (mock data for demo). The mock
+    # timeline is the same shape scaled by each stage's latency, and the
+    # sparkline normalizes scale away, so its points are computed once.
+    # Each distinct polyline is defined once in a sprite and rows <use> it
+    mock_points = _sparkline_points(MOCK_TIMELINE)
+    sparkline_symbols = {}  # polyline points -> symbol id
+    stage_charts = []
+    for stage, latency in stage_latencies.items():
+        if latency > 0:
+            points = mock_points
+        else:
+            points = _sparkline_points([latency * factor for factor in MOCK_TIMELINE])
+        symbol_id = sparkline_symbols.setdefault(points, f"spark-{len(sparkline_symbols)}")
+        sparkline = f'<svg width="100" height="20" style="display: inline-block;"><use href="#{symbol_id}"/></svg>'
+        stage_charts.append(f'''
+        <tr>
+            <td>{stage.title()}</td>
+            <td>{latency*1000:.1f}ms</td>
+            <td>{sparkline}</td>
+        </tr>
+        ''')
+    
+    yield _RUN_REPORT_HEAD.format(run_id=run_id)
+    yield _RUN_REPORT_CSS
+    yield _RUN_REPORT_BODY.format(
+        run_id=run_id, profile=profile, frames=frames, avg_fps=avg_fps, duration=duration,
+        overlay_link=overlay_link, sparkline_sprite=_sparkline_sprite(sparkline_symbols)
+    )
+    yield from stage_charts
+    yield _RUN_REPORT_GALLERY
+    yield gallery_html
+    yield _RUN_REPORT_FOOTER.format(generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def generate_index_html(runs_data: List[Dict[str, Any]], runs_dir: Path) -> str:
+    """Generate index.html with links to all run reports."""
+    return "".join(generate_index_html_stream(runs_data, runs_dir))
+
+
+def generate_index_html_stream(runs_data: List[Dict[str, Any]], runs_dir: Path) -> Iterator[str]:
+    """Yield index.html in chunks, one per run row, for writelines()."""
+    yield _INDEX_HEAD
+    yield _INDEX_CSS
+    yield _INDEX_BODY
     
-    return html_content
+    for run_data in sorted(runs_data, key=lambda x: x.get("start_time", ""), reverse=True):
+        run_id = run_data.get("run_id", "unknown")
+        profile = run_data.get("profile", "unknown")
+        frames = run_data.get("frames_processed", 0)
+        duration = run_data.get("duration_sec", 0)
+        start_time = run_data.get("start_time", "")
+        
+        # Format start time
+        try:
+            dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+            formatted_time = dt.strftime("%Y-%m-%d %H:%M")
+        except:
+            formatted_time = start_time[:16] if start_time else "Unknown"
+        
+        # Check for files
+        run_dir = runs_dir / run_id
+        has_report = (run_dir / "report.html").exists()
+        has_video = (run_dir / "overlay.mp4").exists()
+        
+        report_link = f'<a href="{run_id}/report.html">📊 Report</a>' if has_report else "No report"
+        video_link = f'<a href="{run_id}/overlay.mp4">🎥 Video</a>' if has_video else "No video"
+        
+        yield f'''
+        <tr>
+            <td><strong>{run_id}</strong></td>
+            <td>{formatted_time}</td>
+            <td>{profile}</td>
+            <td>{frames:,}</td>
+            <td>{duration:.1f}s</td>
+            <td>{report_link}</td>
+            <td>{video_link}</td>
+        </tr>
+        '''
+    
+    yield _INDEX_FOOTER.format(generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _run_dir_entries(runs_dir: Path) -> List[os.DirEntry]:
+    """Run directories under runs_dir, skipping hidden ones."""
+    # scandir's entries answer is_dir() from the directory listing and
+    # cache stat(), so each run costs at most one stat call
+    with os.scandir(runs_dir) as entries:
+        return [entry for entry in entries if entry.is_dir() and not entry.name.startswith('.')]
 
 
 def main():
@@ -480,30 +592,27 @@ def main():
         # Generate index gallery
         print("Generating runs gallery...")
         
-        all_runs = []
-        for run_subdir in runs_dir.iterdir():
-            if run_subdir.is_dir() and not run_subdir.name.startswith('.'):
-                run_data = load_run_data(run_subdir)
-                if run_data:
-                    all_runs.append(run_data)
+        # Run loads are small blocking reads; overlap them across threads
+        run_dirs = [Path(entry.path) for entry in _run_dir_entries(runs_dir)]
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="ins-report") as pool:
+            all_runs = [run_data for run_data in pool.map(load_run_data, run_dirs) if run_data]
                     
-        index_html = generate_index_html(all_runs, runs_dir)
         index_path = runs_dir / "index.html"
         
-        with open(index_path, 'w') as f:
-            f.write(index_html)
+        with open(index_path, 'w', buffering=WRITE_BUFFER_BYTES) as f:
+            f.writelines(generate_index_html_stream(all_runs, runs_dir))
             
         print(f"Gallery saved to: {index_path}")
         
     else:
         # Generate report for latest run
-        run_dirs = [d for d in runs_dir.iterdir() if d.is_dir() and not d.name.startswith('.')]
+        run_dirs = _run_dir_entries(runs_dir)
         if not run_dirs:
             print("No run directories found")
             return 1
             
         # Get most recent run directory
-        latest_run = max(run_dirs, key=lambda x: x.stat().st_mtime)
+        latest_run = Path(max(run_dirs, key=lambda entry: entry.stat().st_mtime).path)
         
         print(f"Generating report for latest run: {latest_run.name}")
         
@@ -512,11 +621,10 @@ def main():
             print(f"Could not load run data from {latest_run}")
             return 1
             
-        report_html = generate_run_report_html(run_data, latest_run)
         report_path = latest_run / "report.html"
         
-        with open(report_path, 'w') as f:
-            f.write(report_html)
+        with open(report_path, 'w', buffering=WRITE_BUFFER_BYTES) as f:
+            f.writelines(generate_run_report_html_stream(run_data, latest_run))
             
         print(f"Report saved to: {report_path}")
     
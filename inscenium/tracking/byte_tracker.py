@@ -6,12 +6,40 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    logger.warning("numba not available, tracker IoU runs in pure Python")
+    HAS_NUMBA = False
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    HAS_SCIPY = True
+except ImportError:
+    logger.warning("scipy not available, tracker falls back to greedy matching")
+    HAS_SCIPY = False
+
+# Tracks keep their last HISTORY_LENGTH boxes; jitter looks at the last
+# JITTER_WINDOW of them
+HISTORY_LENGTH = 30
+JITTER_WINDOW = 10
+
 
 def iou(bbox1, bbox2):
     """Calculate IoU between two bboxes in [x, y, w, h] format."""
     x1, y1, w1, h1 = bbox1
     x2, y2, w2, h2 = bbox2
     
+    # Most pairs are far apart: centers further apart than the half extents
+    # cannot overlap (squared to skip abs())
+    dx = (x1 + w1 * 0.5) - (x2 + w2 * 0.5)
+    dy = (y1 + h1 * 0.5) - (y2 + h2 * 0.5)
+    rx = (w1 + w2) * 0.5
+    ry = (h1 + h2) * 0.5
+    if dx * dx > rx * rx or dy * dy > ry * ry:
+        return 0.0
+    
     # Convert to [x1, y1, x2, y2]
     box1 = [x1, y1, x1 + w1, y1 + h1]
     box2 = [x2, y2, x2 + w2, y2 + h2]
@@ -33,6 +61,48 @@ def iou(bbox1, bbox2):
     return intersection / union if union > 0 else 0.0
 
 
+def _iou_matrix_python(track_boxes: np.ndarray, det_boxes: np.ndarray) -> np.ndarray:
+    """IoU of every track/detection pair through iou(), used without Numba."""
+    out = np.zeros((track_boxes.shape[0], det_boxes.shape[0]))
+    for i, track_box in enumerate(track_boxes.tolist()):
+        for j, det_box in enumerate(det_boxes.tolist()):
+            out[i, j] = iou(track_box, det_box)
+    return out
+
+
+if HAS_NUMBA:
+    @njit("float64[:,::1](float64[:,::1], float64[:,::1])", nogil=True, cache=True)
+    def _iou_matrix(track_boxes, det_boxes):
+        """IoU of every (N, 4) track box with every (M, 4) detection, [x, y, w, h]."""
+        out = np.zeros((track_boxes.shape[0], det_boxes.shape[0]))
+        for i in range(track_boxes.shape[0]):
+            tx1 = track_boxes[i, 0]
+            ty1 = track_boxes[i, 1]
+            tx2 = tx1 + track_boxes[i, 2]
+            ty2 = ty1 + track_boxes[i, 3]
+            track_area = track_boxes[i, 2] * track_boxes[i, 3]
+            for j in range(det_boxes.shape[0]):
+                dx1 = det_boxes[j, 0]
+                dy1 = det_boxes[j, 1]
+                dx2 = dx1 + det_boxes[j, 2]
+                dy2 = dy1 + det_boxes[j, 3]
+                
+                x_left = max(tx1, dx1)
+                y_top = max(ty1, dy1)
+                x_right = min(tx2, dx2)
+                y_bottom = min(ty2, dy2)
+                if x_right <= x_left or y_bottom <= y_top:
+                    continue
+                    
+                intersection = (x_right - x_left) * (y_bottom - y_top)
+                union = track_area + det_boxes[j, 2] * det_boxes[j, 3] - intersection
+                if union > 0:
+                    out[i, j] = intersection / union
+        return out
+else:
+    _iou_matrix = _iou_matrix_python
+
+
 def center(bbox):
     """Get center point of bbox [x, y, w, h]."""
     x, y, w, h = bbox
@@ -50,7 +120,18 @@ class Track:
         self.age = 1
         self.lost_count = 0
         self.last_conf = detection["conf"]
-        self.bbox_history = [detection["bbox"]]
+        
+        # Ring buffer of recent [x, y, w, h] boxes, _history_head is the next slot
+        self.bbox_history = np.zeros((HISTORY_LENGTH, 4))
+        self.bbox_history[0] = detection["bbox"]
+        self._history_head = 1
+        self._history_count = 1
+        self._jitter = None  # bbox_jitter, until the next box arrives
+        
+        # Running sums of box centers over the last JITTER_WINDOW boxes
+        cx, cy = center(detection["bbox"])
+        self._cx_sum, self._cy_sum = cx, cy
+        self._cx_sqsum, self._cy_sqsum = cx * cx, cy * cy
         
     def update(self, detection: Dict[str, Any]):
         """Update track with new detection."""
@@ -62,12 +143,25 @@ class Track:
         self.last_conf = detection["conf"]
         self.age += 1
         self.lost_count = 0
-        self.bbox_history.append(detection["bbox"])
         
-        # Keep only recent history
-        if len(self.bbox_history) > 30:
-            self.bbox_history = self.bbox_history[-30:]
-            
+        # Drop the center leaving the jitter window, add the new one
+        if self._history_count >= JITTER_WINDOW:
+            old_cx, old_cy = center(self.bbox_history[(self._history_head - JITTER_WINDOW) % HISTORY_LENGTH].tolist())
+            self._cx_sum -= old_cx
+            self._cy_sum -= old_cy
+            self._cx_sqsum -= old_cx * old_cx
+            self._cy_sqsum -= old_cy * old_cy
+        new_cx, new_cy = new_center
+        self._cx_sum += new_cx
+        self._cy_sum += new_cy
+        self._cx_sqsum += new_cx * new_cx
+        self._cy_sqsum += new_cy * new_cy
+        
+        self.bbox_history[self._history_head] = detection["bbox"]
+        self._history_head = (self._history_head + 1) % HISTORY_LENGTH
+        self._history_count = min(HISTORY_LENGTH, self._history_count + 1)
+        self._jitter = None
+        
     def predict(self):
         """Predict next position (simple: no motion model)."""
         self.age += 1
@@ -75,22 +169,29 @@ class Track:
         
     @property
     def bbox_jitter(self) -> float:
-        """Calculate bbox jitter based on history."""
-        if len(self.bbox_history) < 2:
-            return 0.0
+        """
+        Calculate bbox jitter based on history.
+        
+        Computed from running center sums over the last JITTER_WINDOW boxes,
+        so it costs the same however long the window. Cached until update()
+        adds a box; lost tracks reuse it every frame.
+        """
+        if self._jitter is not None:
+            return self._jitter
             
-        centers = [center(bbox) for bbox in self.bbox_history[-10:]]
-        if len(centers) < 2:
+        count = min(JITTER_WINDOW, self._history_count)
+        if count < 2:
+            self._jitter = 0.0
             return 0.0
             
-        # Calculate variance in center positions
-        x_coords = [c[0] for c in centers]
-        y_coords = [c[1] for c in centers]
-        
-        x_var = np.var(x_coords) if len(x_coords) > 1 else 0.0
-        y_var = np.var(y_coords) if len(y_coords) > 1 else 0.0
+        # Calculate variance in center positions, E[c^2] - E[c]^2
+        x_mean = self._cx_sum / count
+        y_mean = self._cy_sum / count
+        x_var = max(0.0, self._cx_sqsum / count - x_mean * x_mean)
+        y_var = max(0.0, self._cy_sqsum / count - y_mean * y_mean)
         
-        return min(1.0, (x_var + y_var) / 1000.0)  # Normalize roughly
+        self._jitter = min(1.0, (x_var + y_var) / 1000.0)  # Normalize roughly
+        return self._jitter
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert track to dictionary."""
@@ -123,45 +224,59 @@ class ByteTracker:
             self._remove_old_tracks()
             return [track.to_dict() for track in self.tracks]
             
-        # Match detections to existing tracks
+        # IoU of every track against every detection in one call
+        track_boxes = np.asarray([track.bbox for track in self.tracks], dtype=np.float64).reshape(-1, 4)
+        det_boxes = np.asarray([det["bbox"] for det in detections], dtype=np.float64).reshape(-1, 4)
+        det_for_track = self._match(_iou_matrix(track_boxes, det_boxes))
+        
         matched_tracks = []
-        matched_dets = set()
+        unmatched_dets = np.ones(len(detections), dtype=bool)
         
-        # Simple greedy matching based on IoU
-        for track in self.tracks:
-            best_iou = 0.0
-            best_det_idx = -1
-            
-            for i, det in enumerate(detections):
-                if i in matched_dets:
-                    continue
-                    
-                iou_val = iou(track.bbox, det["bbox"])
-                if iou_val > best_iou and iou_val > self.iou_thresh:
-                    best_iou = iou_val
-                    best_det_idx = i
-                    
-            if best_det_idx >= 0:
-                track.update(detections[best_det_idx])
+        for track, det_idx in zip(self.tracks, det_for_track.tolist()):
+            if det_idx >= 0:
+                track.update(detections[det_idx])
                 matched_tracks.append(track)
-                matched_dets.add(best_det_idx)
+                unmatched_dets[det_idx] = False
             else:
                 track.predict()
                 if track.lost_count <= self.max_age:
                     matched_tracks.append(track)
                     
         # Create new tracks for unmatched detections
-        for i, det in enumerate(detections):
-            if i not in matched_dets:
-                new_track = Track(self.next_id, det)
-                matched_tracks.append(new_track)
-                self.next_id += 1
-                
+        for i in np.flatnonzero(unmatched_dets).tolist():
+            new_track = Track(self.next_id, detections[i])
+            matched_tracks.append(new_track)
+            self.next_id += 1
+            
         self.tracks = matched_tracks
         self._remove_old_tracks()
         
         return [track.to_dict() for track in self.tracks]
         
+    def _match(self, iou_mat: np.ndarray) -> np.ndarray:
+        """
+        Assign detections to tracks from their (tracks, detections) IoU matrix.
+        
+        Pairs at or below iou_thresh never match. With scipy the assignment
+        maximizes total IoU; without it each track takes its best remaining
+        detection in order. Returns each track's detection index, -1 if none.
+        """
+        iou_mat[iou_mat <= max(self.iou_thresh, 0.0)] = 0.0
+        det_for_track = np.full(iou_mat.shape[0], -1, dtype=np.int64)
+        
+        if HAS_SCIPY:
+            rows, cols = linear_sum_assignment(iou_mat, maximize=True)
+            matched = iou_mat[rows, cols] > 0.0
+            det_for_track[rows[matched]] = cols[matched]
+            return det_for_track
+            
+        for i, track_ious in enumerate(iou_mat):
+            best_det_idx = int(np.argmax(track_ious))
+            if track_ious[best_det_idx] > 0.0:
+                det_for_track[i] = best_det_idx
+                iou_mat[:, best_det_idx] = -1.0  # taken
+        return det_for_track
+        
     def _remove_old_tracks(self):
         """Remove tracks that are too old."""
         self.tracks = [t for t in self.tracks if t.lost_count <= self.max_age]
\ No newline at end of file
@@ -1,10 +1,33 @@
 """File system utilities."""
 
 import json
-import tempfile
+import os
 from pathlib import Path
 from typing import Any, Dict
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False  # Windows
+
+# Appends up to PIPE_BUF bytes are a single atomic write on POSIX; longer
+# lines also take an exclusive lock
+ATOMIC_APPEND_MAX_BYTES = 4096
+
+
+def _dumps_line(obj: Dict[str, Any]) -> bytes:
+    """Serialize obj as one newline-terminated JSON line."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj) + b"\n"
+    return (json.dumps(obj) + "\n").encode()
+
 
 def safe_mkdirs(path: str) -> Path:
     """Safely create directory structure."""
@@ -14,25 +37,31 @@ def safe_mkdirs(path: str) -> Path:
 
 
 def atomic_append_jsonl(path: Path, obj: Dict[str, Any]):
-    """Atomically append JSON object as line to file."""
+    """
+    Atomically append JSON object as line to file.
+    
+    Writes only the new line, with one write() on an O_APPEND descriptor,
+    then fsyncs it. Concurrent appenders do not interleave within a line;
+    lines over ATOMIC_APPEND_MAX_BYTES hold an flock while writing.
+    """
     path = Path(path)
     
     # Create parent directories
     path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Write to temp file first
-    with tempfile.NamedTemporaryFile(mode='w', dir=path.parent, 
-                                   prefix=f".{path.name}.", 
-                                   delete=False) as f:
-        temp_path = Path(f.name)
-        
-        # If target exists, copy existing content
-        if path.exists():
-            with open(path, 'r') as existing:
-                f.write(existing.read())
-                
-        # Append new line
-        f.write(json.dumps(obj) + '\n')
-        
-    # Atomic rename
-    temp_path.replace(path)
\ No newline at end of file
+    line = _dumps_line(obj)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        lock = HAS_FCNTL and len(line) > ATOMIC_APPEND_MAX_BYTES
+        if lock:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            view = memoryview(line)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            if lock:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -2,6 +2,8 @@
 
 from typing import List, Tuple
 
+import numpy as np
+
 
 def polygon_contains(point: Tuple[float, float], polygon: List[List[float]]) -> bool:
     """Test if point is inside polygon using ray casting algorithm."""
@@ -24,11 +26,46 @@ def polygon_contains(point: Tuple[float, float], polygon: List[List[float]]) ->
     return inside
 
 
+def polygon_contains_batch(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """
+    Vectorized polygon_contains over (N, 2) points, same edge convention.
+    
+    Each polygon edge is tested against all points at once and the crossings
+    are XOR-ed, so there is no Python loop over points.
+    """
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    p1 = polygon
+    p2 = np.roll(polygon, -1, axis=0)
+    p1x, p1y, p2x, p2y = p1[:, 0], p1[:, 1], p2[:, 0], p2[:, 1]
+    
+    # Horizontal edges never pass the y test, so their xinters is never used
+    dy = np.where(p1y != p2y, p2y - p1y, 1.0)
+    xinters = (y - p1y) * (p2x - p1x) / dy + p1x
+    
+    crosses = (
+        (y > np.minimum(p1y, p2y)) &
+        (y <= np.maximum(p1y, p2y)) &
+        (x <= np.maximum(p1x, p2x)) &
+        ((p1x == p2x) | (x <= xinters))
+    )
+    return np.logical_xor.reduce(crosses, axis=1)
+
+
 def iou(bbox1: List[int], bbox2: List[int]) -> float:
     """Calculate IoU between two bboxes in [x, y, w, h] format."""
     x1, y1, w1, h1 = bbox1
     x2, y2, w2, h2 = bbox2
     
+    # Most pairs are far apart: centers further apart than the half extents
+    # cannot overlap (squared to skip abs())
+    dx = (x1 + w1 * 0.5) - (x2 + w2 * 0.5)
+    dy = (y1 + h1 * 0.5) - (y2 + h2 * 0.5)
+    rx = (w1 + w2) * 0.5
+    ry = (h1 + h2) * 0.5
+    if dx * dx > rx * rx or dy * dy > ry * ry:
+        return 0.0
+    
     # Convert to [x1, y1, x2, y2]
     box1 = [x1, y1, x1 + w1, y1 + h1]
     box2 = [x2, y2, x2 + w2, y2 + h2]
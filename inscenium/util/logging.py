@@ -1,11 +1,14 @@
 """Logging utilities with Rich console output."""
 
+import atexit
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional, Union
 
 try:
     from rich.console import Console
@@ -15,23 +18,36 @@ try:
 except ImportError:
     HAS_RICH = False
 
+# Log file writes are batched through a buffer of this size
+LOG_WRITE_BUFFER_BYTES = 1 << 16
+
+# Background listener that owns the log file handler, see setup_logging()
+_file_listener: Optional[logging.handlers.QueueListener] = None
+_file_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
 
 class EmojiFormatter(logging.Formatter):
     """Formatter that adds emojis for rich mode."""
     
     EMOJI_MAP = {
-        "INFO": "▶️",
-        "WARNING": "⚠️",
-        "ERROR": "❌",  
-        "DEBUG": "🐛",
-        "CRITICAL": "💥"
+        logging.INFO: "▶️",
+        logging.WARNING: "⚠️",
+        logging.ERROR: "❌",  
+        logging.DEBUG: "🐛",
+        logging.CRITICAL: "💥"
     }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # INS_LOG_FORMAT is read once, not per record
+        self._enabled = os.environ.get("INS_LOG_FORMAT", "").lower() == "rich"
+    
     def format(self, record):
         # Add emoji prefix for rich mode
-        log_format = os.environ.get("INS_LOG_FORMAT", "").lower()
-        if log_format == "rich" and record.levelname in self.EMOJI_MAP:
-            record.msg = f"{self.EMOJI_MAP[record.levelname]} {record.msg}"
+        if self._enabled:
+            prefix = self.EMOJI_MAP.get(record.levelno)
+            if prefix:
+                record.msg = f"{prefix} {record.msg}"
         return super().format(record)
 
 
@@ -50,10 +66,74 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(log_entry)
 
 
+class BufferedFileHandler(logging.FileHandler):
+    """FileHandler that buffers writes instead of flushing every record."""
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, encoding=self.encoding,
+                    errors=self.errors, buffering=LOG_WRITE_BUFFER_BYTES)
+    
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        # Errors are written out at once so they survive a crash
+        if record.levelno >= logging.ERROR:
+            self.flush()
+
+
+class RunIdAdapter(logging.LoggerAdapter):
+    """Logger adapter that prefixes messages with the run id and tags records with it."""
+    
+    def __init__(self, logger: logging.Logger, run_id: str):
+        super().__init__(logger, {"run_id": run_id})
+        self._prefix = f"[{run_id}] "
+    
+    def process(self, msg, kwargs):
+        # record.run_id is picked up by JsonFormatter
+        kwargs["extra"] = {**self.extra, **kwargs.get("extra", {})}
+        return self._prefix + str(msg), kwargs
+
+
+def debug_lazy(logger: Union[logging.Logger, logging.LoggerAdapter],
+               fn: Callable[..., Any], *args):
+    """
+    Log fn(*args) at DEBUG, calling fn only if DEBUG is enabled.
+    
+    For debug messages whose arguments are expensive to build, e.g.
+    debug_lazy(logger, summarize, tracks); a plain logger.debug(...) call
+    evaluates its arguments even when the record is dropped.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(fn(*args))
+
+
+def stop_file_logging():
+    """Flush queued file records and stop the background file writer."""
+    global _file_listener, _file_queue_handler
+    
+    if _file_queue_handler is not None:
+        logging.getLogger().removeHandler(_file_queue_handler)
+        _file_queue_handler = None
+    if _file_listener is not None:
+        _file_listener.stop()
+        for handler in _file_listener.handlers:
+            handler.flush()
+        _file_listener = None
+
+
+atexit.register(stop_file_logging)
+
+
 def setup_logging(run_id: Optional[str] = None, 
                  log_dir: Optional[Path] = None,
-                 level: str = "INFO") -> logging.Logger:
+                 level: str = "INFO") -> Union[logging.Logger, RunIdAdapter]:
     """Set up Rich console logging with optional file output."""
+    global _file_listener, _file_queue_handler
     
     # Install rich traceback handler if available
     if HAS_RICH:
@@ -67,6 +147,7 @@ def setup_logging(run_id: Optional[str] = None,
     root_logger.setLevel(getattr(logging, level.upper()))
     
     # Clear existing handlers
+    stop_file_logging()
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
@@ -104,34 +185,32 @@ def setup_logging(run_id: Optional[str] = None,
     
     root_logger.addHandler(console_handler)
     
-    # File handler if log directory specified
+    # File handler if log directory specified; records are queued and
+    # written by a listener thread so logging calls never block on disk
     if log_dir:
         log_dir = Path(log_dir)
         log_dir.mkdir(parents=True, exist_ok=True)
         
         log_file = log_dir / "inscenium.log"
-        file_handler = logging.FileHandler(log_file)
+        file_handler = BufferedFileHandler(log_file)
         file_handler.setFormatter(
             logging.Formatter(
                 '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
             )
         )
-        root_logger.addHandler(file_handler)
+        
+        log_queue = queue.Queue(-1)
+        _file_queue_handler = logging.handlers.QueueHandler(log_queue)
+        _file_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, respect_handler_level=True
+        )
+        _file_listener.start()
+        root_logger.addHandler(_file_queue_handler)
     
-    # Create inscenium logger with run_id prefix
+    # Create inscenium logger, prefixed with run_id when given
     inscenium_logger = logging.getLogger("inscenium")
     
     if run_id:
-        # Add run_id to all inscenium log messages
-        class RunIdFilter:
-            def __init__(self, run_id):
-                self.run_id = run_id
-                
-            def filter(self, record):
-                record.msg = f"[{self.run_id}] {record.msg}"
-                return True
-                
-        run_filter = RunIdFilter(run_id)
-        inscenium_logger.addFilter(run_filter)
-    
-    return inscenium_logger
\ No newline at end of file
+        return RunIdAdapter(inscenium_logger, run_id)
+    
+    return inscenium_logger
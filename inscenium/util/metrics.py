@@ -4,59 +4,118 @@ import time
 from typing import Dict, Any
 from collections import defaultdict, deque
 
+import numpy as np
+
+# Pipeline stages timed per frame, in accumulator order
+STAGES = ("detection", "tracking", "uaor", "sgi_write", "render")
+STAGE_IDX = {name: i for i, name in enumerate(STAGES)}
+STAGE_DETECTION, STAGE_TRACKING, STAGE_UAOR, STAGE_SGI_WRITE, STAGE_RENDER = range(len(STAGES))
+
+# Stage latencies average the most recent samples only
+LATENCY_WINDOW = 1000
+
+
+class _StageTimer:
+    """Context manager recording elapsed nanoseconds into one stage slot."""
+    
+    __slots__ = ("_metrics", "_idx", "_t0")
+    
+    def __init__(self, metrics: "Metrics", idx: int):
+        self._metrics = metrics
+        self._idx = idx
+        
+    def __enter__(self):
+        self._t0 = time.perf_counter_ns()
+        return self
+        
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Like timer_end, a stage that raised is not counted
+        if exc_type is None:
+            self._metrics._record(self._idx, time.perf_counter_ns() - self._t0)
+        return False
+
 
 class Metrics:
     """Track pipeline metrics and performance."""
     
     def __init__(self):
         self.counters = defaultdict(int)
-        self.timers = defaultdict(list)
         self.fps_window = deque(maxlen=100)
-        self.stage_times = defaultdict(list)
-        self.start_time = time.time()
+        self._fps_sum = 0.0
+        self.stages = list(STAGES)
+        self._stage_idx = dict(STAGE_IDX)
+        # Ring buffer of recent durations (ns) per stage, its running sum,
+        # plus samples seen
+        self.stage_ns = np.zeros((len(self.stages), LATENCY_WINDOW), dtype=np.int64)
+        self.stage_sum_ns = np.zeros(len(self.stages), dtype=np.int64)
+        self.stage_counts = np.zeros(len(self.stages), dtype=np.int64)
+        self.start_time = time.perf_counter()
         
     def increment(self, counter: str, value: int = 1):
         """Increment a counter."""
         self.counters[counter] += value
         
+    def time(self, stage: int) -> _StageTimer:
+        """Time a block into a stage slot, e.g. `with metrics.time(STAGE_DETECTION):`."""
+        return _StageTimer(self, stage)
+        
+    def _stage_index(self, name: str) -> int:
+        """Slot for a stage name, adding one for stages outside STAGES."""
+        idx = self._stage_idx.get(name)
+        if idx is None:
+            idx = self._stage_idx[name] = len(self.stages)
+            self.stages.append(name)
+            self.stage_ns = np.vstack([self.stage_ns, np.zeros((1, LATENCY_WINDOW), dtype=np.int64)])
+            self.stage_sum_ns = np.append(self.stage_sum_ns, 0)
+            self.stage_counts = np.append(self.stage_counts, 0)
+        return idx
+        
+    def _record(self, idx: int, duration_ns: int):
+        """Store one stage duration, overwriting the oldest once the window is full."""
+        count = self.stage_counts[idx]
+        slot = count % LATENCY_WINDOW
+        # Unfilled slots are zero, so subtracting the old value is always right
+        self.stage_sum_ns[idx] += duration_ns - self.stage_ns[idx, slot]
+        self.stage_ns[idx, slot] = duration_ns
+        self.stage_counts[idx] = count + 1
+        
     def timer_start(self, name: str) -> float:
         """Start timing an operation."""
-        return time.time()
+        return time.perf_counter()
         
     def timer_end(self, name: str, start_time: float):
         """End timing an operation."""
-        duration = time.time() - start_time
-        self.timers[name].append(duration)
-        self.stage_times[name].append(duration)
+        self._record(self._stage_index(name), int((time.perf_counter() - start_time) * 1e9))
         
-        # Keep only recent measurements
-        if len(self.stage_times[name]) > 1000:
-            self.stage_times[name] = self.stage_times[name][-500:]
-            
     def update_fps(self, frame_time: float):
         """Update FPS measurement."""
+        # Keep the window sum current so get_avg_fps is O(1)
+        if len(self.fps_window) == self.fps_window.maxlen:
+            self._fps_sum -= self.fps_window[0]
         self.fps_window.append(frame_time)
+        self._fps_sum += frame_time
         
     def get_avg_fps(self) -> float:
         """Get average FPS from recent frames."""
         if not self.fps_window:
             return 0.0
             
-        avg_time = sum(self.fps_window) / len(self.fps_window)
+        avg_time = self._fps_sum / len(self.fps_window)
         return 1.0 / avg_time if avg_time > 0 else 0.0
         
     def get_stage_latencies(self) -> Dict[str, float]:
-        """Get average latencies for each stage."""
-        latencies = {}
-        for stage, times in self.stage_times.items():
-            if times:
-                latencies[stage] = sum(times) / len(times)
-        return latencies
+        """Get average latencies in seconds for each stage over recent samples."""
+        filled = np.minimum(self.stage_counts, LATENCY_WINDOW)
+        return {
+            stage: float(total) / n / 1e9
+            for stage, total, n in zip(self.stages, self.stage_sum_ns.tolist(), filled.tolist())
+            if n
+        }
         
     def to_dict(self) -> Dict[str, Any]:
         """Convert metrics to dictionary for JSON export."""
         return {
-            "runtime_sec": time.time() - self.start_time,
+            "runtime_sec": time.perf_counter() - self.start_time,
             "counters": dict(self.counters),
             "avg_fps": self.get_avg_fps(),
             "stage_latencies": self.get_stage_latencies(),
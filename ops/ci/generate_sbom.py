@@ -16,6 +16,7 @@ import os
 import subprocess
 import sys
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -24,6 +25,26 @@ import requests
 import toml
 import yaml
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Buffer size for SBOM file writes
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    """Write indented JSON, serialized by orjson in one call when available"""
+    if HAS_ORJSON:
+        with open(path, "wb", buffering=WRITE_BUFFER_BYTES) as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", buffering=WRITE_BUFFER_BYTES) as f:
+            json.dump(data, f, indent=2)
+
+
 class SBOMGenerator:
     def __init__(self, project_root: Path):
         self.project_root = project_root
@@ -87,12 +108,11 @@ class SBOMGenerator:
         if not filepath.exists():
             return {}
         
-        sha256_hash = hashlib.sha256()
         try:
+            # file_digest hashes in C with large reads and releases the GIL
             with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    sha256_hash.update(chunk)
-            return {"alg": "SHA-256", "content": sha256_hash.hexdigest()}
+                digest = hashlib.file_digest(f, "sha256")
+            return {"alg": "SHA-256", "content": digest.hexdigest()}
         except Exception:
             return {}
 
@@ -127,10 +147,11 @@ class SBOMGenerator:
                 # Also try pip freeze as fallback
                 pip_output = self._run_command(["pip", "freeze"])
                 if pip_output:
+                    seen = {c["name"] for c in components}
                     for line in pip_output.split('\n'):
                         if '==' in line:
                             name, version = line.split('==', 1)
-                            if not any(c["name"] == name for c in components):
+                            if name not in seen:
                                 component = {
                                     "type": "library", 
                                     "bom-ref": f"python-{name}-{version}",
@@ -140,6 +161,7 @@ class SBOMGenerator:
                                     "scope": "required"
                                 }
                                 components.append(component)
+                                seen.add(name)
                                 
             except Exception as e:
                 print(f"Error scanning Python dependencies: {e}")
@@ -223,6 +245,7 @@ class SBOMGenerator:
                         workspace_data = toml.load(f)
                     
                     workspace_deps = workspace_data.get("dependencies", {})
+                    seen = {c["name"] for c in components}
                     for name, version_info in workspace_deps.items():
                         if isinstance(version_info, str):
                             version = version_info
@@ -231,7 +254,7 @@ class SBOMGenerator:
                         else:
                             version = "unknown"
                         
-                        if not any(c["name"] == name for c in components):
+                        if name not in seen:
                             component = {
                                 "type": "library",
                                 "bom-ref": f"rust-{name}-{version}",
@@ -241,6 +264,7 @@ class SBOMGenerator:
                                 "scope": "required"
                             }
                             components.append(component)
+                            seen.add(name)
                             
             except Exception as e:
                 print(f"Error scanning Rust dependencies: {e}")
@@ -308,12 +332,17 @@ class SBOMGenerator:
 
     def generate_cyclone_dx(self) -> Dict[str, Any]:
         """Generate CycloneDX SBOM"""
-        # Collect all dependencies
-        all_components = []
-        all_components.extend(self.scan_python_dependencies())
-        all_components.extend(self.scan_go_dependencies())
-        all_components.extend(self.scan_rust_dependencies()) 
-        all_components.extend(self.scan_node_dependencies())
+        # Collect all dependencies; the scanners are independent and mostly
+        # wait on subprocesses, so run them side by side
+        scanners = (
+            self.scan_python_dependencies,
+            self.scan_go_dependencies,
+            self.scan_rust_dependencies,
+            self.scan_node_dependencies,
+        )
+        with ThreadPoolExecutor(max_workers=len(scanners)) as executor:
+            futures = [executor.submit(scan) for scan in scanners]
+            all_components = [c for future in futures for c in future.result()]
         
         self.sbom_data["components"] = all_components
         
@@ -406,12 +435,10 @@ class SBOMGenerator:
         spdx = self.generate_spdx()
         
         # Save CycloneDX JSON
-        with open(output_dir / "sbom-cyclonedx.json", "w") as f:
-            json.dump(cyclone_dx, f, indent=2)
+        _write_json(output_dir / "sbom-cyclonedx.json", cyclone_dx)
             
         # Save SPDX JSON  
-        with open(output_dir / "sbom-spdx.json", "w") as f:
-            json.dump(spdx, f, indent=2)
+        _write_json(output_dir / "sbom-spdx.json", spdx)
             
         # Save SPDX YAML
         with open(output_dir / "sbom-spdx.yaml", "w") as f:
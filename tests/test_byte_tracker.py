@@ -0,0 +1,54 @@
+"""Tests for IoU tracking."""
+
+import numpy as np
+
+from inscenium.tracking import byte_tracker
+from inscenium.tracking.byte_tracker import ByteTracker, iou
+
+
+def _detection(bbox, conf: float = 0.9):
+    """Detection dict as the detector returns it."""
+    return {"bbox": bbox, "label": "person", "conf": conf}
+
+
+def test_iou_matrix_matches_iou():
+    """The compiled matrix agrees with the scalar iou() for every pair."""
+    rng = np.random.default_rng(0)
+    track_boxes = rng.integers(-5, 100, size=(12, 4)).astype(np.float64)
+    det_boxes = rng.integers(-5, 100, size=(9, 4)).astype(np.float64)
+    
+    result = byte_tracker._iou_matrix(track_boxes, det_boxes)
+    expected = [[iou(t, d) for d in det_boxes.tolist()] for t in track_boxes.tolist()]
+    assert np.allclose(result, expected)
+    assert byte_tracker._iou_matrix(track_boxes, det_boxes[:0]).shape == (12, 0)
+
+
+def test_tracker_keeps_ids_across_frames():
+    """Overlapping detections continue their track, new ones get new ids."""
+    tracker = ByteTracker(max_age=2)
+    first = tracker.update([_detection([0, 0, 50, 50]), _detection([200, 200, 40, 40])])
+    assert [t["id"] for t in first] == [1, 2]
+    
+    second = tracker.update([_detection([202, 201, 40, 40]), _detection([4, 2, 50, 50])])
+    assert sorted((t["id"], t["bbox"][0]) for t in second) == [(1, 4), (2, 202)]
+    
+    third = tracker.update([_detection([400, 400, 20, 20])])
+    assert [(t["id"], t["lost"]) for t in third] == [(1, 1), (2, 1), (3, 0)]
+
+
+def test_tracker_assignment_maximizes_total_iou(monkeypatch):
+    """A track does not take a shared detection another track needs more."""
+    tracks = [_detection([0, 0, 10, 10]), _detection([5, 0, 10, 10])]
+    detections = [_detection([3, 0, 10, 10]), _detection([-3, 0, 10, 10])]
+    
+    tracker = ByteTracker()
+    tracker.update(tracks)
+    result = tracker.update(detections)
+    assert sorted((t["id"], t["bbox"][0]) for t in result) == [(1, -3), (2, 3)]
+    
+    # Greedy fallback: the first track takes the first detection
+    monkeypatch.setattr(byte_tracker, "HAS_SCIPY", False)
+    tracker = ByteTracker()
+    tracker.update(tracks)
+    result = tracker.update(detections)
+    assert sorted((t["id"], t["bbox"][0], t["lost"]) for t in result) == [(1, 3, 0), (2, 5, 1), (3, -3, 0)]
@@ -0,0 +1,95 @@
+"""Tests for the compiled edge pipeline kernels."""
+
+import numpy as np
+
+from edge import edge_kernels as kernels
+from edge.edge_processor import EdgeConfig, EdgeProcessor, pack_bboxes, packed_bbox_iou
+
+
+def _draws(batch_size: int, seed: int = 0) -> np.ndarray:
+    """Uniform draws laid out the way the processor fills them."""
+    rng = np.random.default_rng(seed)
+    return rng.random((batch_size, kernels.NUM_DRAWS), dtype=np.float32)
+
+
+def test_run_pipeline_batch_matches_single_frame():
+    """The batch kernel writes the same outputs as run_pipeline per frame."""
+    batch_size = 3
+    frames = np.zeros((batch_size, 72, 128, 3), dtype=np.uint8)
+    draws = _draws(batch_size)
+    buffers = kernels.allocate_buffers(batch_size)
+    kernels.run_pipeline_batch(
+        frames, draws, buffers["bboxes"], buffers["confidences"], buffers["types"],
+        buffers["depth_mm"], buffers["scalars"], buffers["counts"]
+    )
+    
+    for b in range(batch_size):
+        single = kernels.allocate_buffers(1)
+        n = kernels.run_pipeline(
+            frames[b], draws[b], single["bboxes"][0], single["confidences"][0],
+            single["types"][0], single["depth_mm"][0], single["scalars"][0]
+        )
+        assert buffers["counts"][b] == n
+        assert np.array_equal(buffers["bboxes"][b, :n], single["bboxes"][0, :n])
+        assert np.array_equal(buffers["depth_mm"][b], single["depth_mm"][0])
+        assert np.array_equal(buffers["scalars"][b], single["scalars"][0])
+
+
+def test_run_pipeline_outputs_in_range():
+    """Surfaces, depth and quality stay within the mock models' ranges."""
+    frame = np.zeros((72, 128, 3), dtype=np.uint8)
+    for seed in range(20):
+        draws = _draws(1, seed)[0]
+        out = kernels.allocate_buffers(1)
+        n = kernels.run_pipeline(
+            frame, draws, out["bboxes"][0], out["confidences"][0],
+            out["types"][0], out["depth_mm"][0], out["scalars"][0]
+        )
+        assert 0 <= n <= 2
+        assert out["scalars"][0, kernels.OUT_NUM_SURFACES] == n
+        assert 0.0 <= out["scalars"][0, kernels.OUT_QUALITY_SCORE] <= 100.0
+        assert kernels.DEPTH_MIN_MM <= out["depth_mm"][0, kernels.DEPTH_MEAN] <= kernels.DEPTH_MAX_MM
+        
+        bboxes = out["bboxes"][0, :n]
+        assert np.all(bboxes[:, 2] > bboxes[:, 0]) and np.all(bboxes[:, 3] > bboxes[:, 1])
+        assert np.all((out["confidences"][0, :n] >= 0.7) & (out["confidences"][0, :n] <= 0.9))
+        assert np.all(out["types"][0, :n] < len(kernels.SURFACE_TYPES))
+
+
+def _float_iou(a, b) -> float:
+    """Reference IoU of two [x0, y0, x1, y1] boxes."""
+    inter_w = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    inter_h = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = inter_w * inter_h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / max(union, 1)
+
+
+def test_packed_bbox_iou_matches_reference():
+    """Packing keeps 16 bits per field and IoU matches the scalar formula."""
+    rng = np.random.default_rng(0)
+    x0 = rng.integers(0, 1200, 16)
+    y0 = rng.integers(0, 700, 16)
+    bboxes = np.stack([x0, y0, x0 + rng.integers(1, 300, 16), y0 + rng.integers(1, 300, 16)], axis=1)
+    
+    packed = pack_bboxes(bboxes)
+    assert packed.dtype == np.uint64
+    
+    iou = packed_bbox_iou(packed)
+    expected = [[_float_iou(a, b) for b in bboxes.tolist()] for a in bboxes.tolist()]
+    assert np.allclose(iou, expected)
+
+
+def test_suppress_overlaps_keeps_strongest_box():
+    """Only boxes overlapping a higher-confidence box are dropped."""
+    processor = EdgeProcessor(EdgeConfig(use_gpu_acceleration=False, opportunity_nms_iou=0.5))
+    bboxes = np.array([
+        [0, 0, 100, 100],
+        [5, 5, 105, 105],  # overlaps the first, weaker
+        [200, 200, 260, 260],
+        [0, 0, 100, 40],  # IoU 0.4 with the first
+    ], dtype=np.int32)
+    confidences = np.array([0.8, 0.9, 0.7, 0.75], dtype=np.float32)
+    
+    keep = processor._suppress_overlaps(bboxes, confidences)
+    assert keep.tolist() == [False, True, True, True]
@@ -0,0 +1,32 @@
+"""Tests for geometry utilities."""
+
+import numpy as np
+
+from inscenium.util.geom import polygon_contains, polygon_contains_batch
+
+
+def test_polygon_contains_batch_matches_polygon_contains():
+    """Vectorized containment agrees with the scalar ray-casting test."""
+    rng = np.random.default_rng(0)
+    polygons = [
+        [[0, 0], [100, 0], [100, 100], [0, 100]],  # square
+        [[10, 10], [90, 20], [50, 80]],  # triangle
+        [[0, 0], [60, 0], [60, 30], [30, 30], [30, 60], [0, 60]],  # concave L
+    ]
+    
+    # Random points plus points on vertices and edges
+    points = np.vstack([
+        rng.uniform(-20, 120, size=(500, 2)),
+        [[0, 0], [100, 100], [50, 0], [0, 50], [30, 45], [60, 15]]
+    ])
+    
+    for polygon in polygons:
+        expected = [polygon_contains(tuple(p), polygon) for p in points.tolist()]
+        result = polygon_contains_batch(points, np.asarray(polygon, dtype=np.float64))
+        assert result.tolist() == expected
+
+
+def test_polygon_contains_batch_empty():
+    """No points gives an empty mask."""
+    polygon = np.array([[0, 0], [10, 0], [10, 10]], dtype=np.float64)
+    assert polygon_contains_batch(np.empty((0, 2)), polygon).shape == (0,)
@@ -0,0 +1,60 @@
+"""Tests for pipeline stage timing."""
+
+import pytest
+
+from inscenium.util import metrics as metrics_module
+from inscenium.util.metrics import STAGE_DETECTION, STAGE_RENDER, STAGES, Metrics
+
+
+def test_stage_timer_records_named_stage():
+    """Timing a stage index reports under its STAGES name."""
+    metrics = Metrics()
+    with metrics.time(STAGE_DETECTION):
+        pass
+    with metrics.time(STAGE_DETECTION):
+        pass
+    
+    latencies = metrics.get_stage_latencies()
+    assert list(latencies) == [STAGES[STAGE_DETECTION]]
+    assert latencies["detection"] >= 0.0
+    assert metrics.stage_counts[STAGE_DETECTION] == 2
+
+
+def test_stage_timer_skips_failed_stage():
+    """A block that raises is not counted."""
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.time(STAGE_RENDER):
+            raise ValueError("boom")
+    assert metrics.get_stage_latencies() == {}
+
+
+def test_timer_start_end_seconds_and_extra_stages():
+    """timer_start/timer_end take float seconds and add unknown stage names."""
+    metrics = Metrics()
+    start = metrics.timer_start("thumbnail")
+    assert isinstance(start, float)
+    metrics.timer_end("thumbnail", start - 0.25)
+    
+    latencies = metrics.get_stage_latencies()
+    assert latencies["thumbnail"] == pytest.approx(0.25, abs=0.05)
+    assert metrics.to_dict()["stage_latencies"] == latencies
+
+
+def test_stage_latencies_use_recent_window(monkeypatch):
+    """Only the last LATENCY_WINDOW samples are averaged."""
+    monkeypatch.setattr(metrics_module, "LATENCY_WINDOW", 4)
+    metrics = Metrics()
+    for duration_ns in (1000, 1000, 1000, 1000, 5000, 5000, 5000, 5000):
+        metrics._record(STAGE_DETECTION, duration_ns)
+    assert metrics.get_stage_latencies()["detection"] == pytest.approx(5e-6)
+
+
+def test_avg_fps_uses_last_100_frames():
+    """The running window sum drops frames evicted from fps_window."""
+    metrics = Metrics()
+    for _ in range(100):
+        metrics.update_fps(0.5)
+    for _ in range(100):
+        metrics.update_fps(0.04)
+    assert metrics.get_avg_fps() == pytest.approx(25.0)
@@ -0,0 +1,51 @@
+"""Tests for SGI event writing."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from inscenium.events import sgi_writer
+from inscenium.events.sgi_writer import SGIWriter
+
+
+def _write_frames(writer: SGIWriter, start: int, count: int):
+    """Write count frames with one track each."""
+    track = {"id": 1, "bbox": [10.0, 10.0, 20.0, 20.0], "label": "person", "conf": np.float32(0.5)}
+    for frame_idx in range(start, start + count):
+        writer.write_frame_data(frame_idx, frame_idx / 30.0, [], [track], {"occlusion": 0.1})
+
+
+def test_sgi_writer_buffers_until_flush():
+    """Lines stay in memory until FLUSH_EVERY_FRAMES frames, then go out together."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with SGIWriter(Path(temp_dir)) as writer:
+            _write_frames(writer, 0, sgi_writer.FLUSH_EVERY_FRAMES - 1)
+            assert writer.events_path.stat().st_size == 0
+            
+            _write_frames(writer, sgi_writer.FLUSH_EVERY_FRAMES - 1, 1)
+            lines = writer.events_path.read_text().splitlines()
+            assert len(lines) == sgi_writer.FLUSH_EVERY_FRAMES
+            assert [json.loads(line)["frame"] for line in lines] == list(range(len(lines)))
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_sgi_writer_close_flushes_remainder(monkeypatch, use_orjson):
+    """close() writes out partial batches and is safe to call twice."""
+    if use_orjson and not sgi_writer.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(sgi_writer, "HAS_ORJSON", use_orjson)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        writer = SGIWriter(Path(temp_dir))
+        _write_frames(writer, 0, 3)
+        writer.close()
+        writer.close()
+        
+        events = [json.loads(line) for line in writer.events_path.read_text().splitlines()]
+        tracks = [json.loads(line) for line in writer.tracks_path.read_text().splitlines()]
+        assert [event["frame"] for event in events] == [0, 1, 2]
+        assert events[0]["uaor"] == {"occlusion": 0.1, "uncertainty": 0.0}
+        assert [record["frame"] for record in tracks] == [0, 1, 2]
+        assert tracks[0]["tracks"][0]["conf"] == 0.5
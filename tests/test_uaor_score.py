@@ -0,0 +1,43 @@
+"""Tests for UAOR heuristic scores."""
+
+import numpy as np
+import pytest
+
+from inscenium.uaor.score import occlusion_score
+
+
+def _overlap_ratio(bbox1, bbox2) -> float:
+    """Reference intersection of two [x, y, w, h] boxes over the first's area."""
+    x1, y1, w1, h1 = bbox1
+    x2, y2, w2, h2 = bbox2
+    inter_w = min(x1 + w1, x2 + w2) - max(x1, x2)
+    inter_h = min(y1 + h1, y2 + h2) - max(y1, y2)
+    if inter_w <= 0 or inter_h <= 0 or w1 * h1 <= 0:
+        return 0.0
+    return inter_w * inter_h / (w1 * h1)
+
+
+def _reference_occlusion(bboxes) -> float:
+    """Pairwise loop the vectorized score replaces."""
+    overlaps = [
+        max(_overlap_ratio(a, b), _overlap_ratio(b, a))
+        for i, a in enumerate(bboxes) for b in bboxes[i + 1:]
+    ]
+    density = min(1.0, len(bboxes) / 10.0)
+    return float(np.clip((sum(overlaps) / len(overlaps) + density) / 2.0, 0.0, 1.0))
+
+
+def test_occlusion_score_matches_pairwise_reference():
+    """Vectorized overlaps agree with the scalar pair loop, zero-area boxes included."""
+    rng = np.random.default_rng(0)
+    for n in range(2, 25):
+        bboxes = rng.integers(0, 80, size=(n, 4)).tolist()
+        bboxes[0][2] = 0
+        tracks = [{"bbox": bbox} for bbox in bboxes]
+        assert occlusion_score({}, tracks) == pytest.approx(_reference_occlusion(bboxes))
+
+
+def test_occlusion_score_single_track():
+    """Fewer than two tracks cannot occlude."""
+    assert occlusion_score({}, []) == 0.0
+    assert occlusion_score({}, [{"bbox": [0, 0, 10, 10]}]) == 0.0
@@ -0,0 +1,103 @@
+"""Tests for pooled frame decoding."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from inscenium.io import video_reader
+from inscenium.io.video_reader import FramePool, VideoReader, VideoWriter
+
+
+def test_frame_pool_recycles_buffers():
+    """Released buffers are handed out again before new ones are allocated."""
+    pool = FramePool((4, 6, 3), size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    extra = pool.acquire()  # pool exhausted, freshly allocated
+    assert first is not second and extra is not first and extra is not second
+    
+    pool.release(first)
+    assert pool.acquire() is first
+
+
+def test_frame_pool_rejects_foreign_buffers():
+    """Views and arrays of another shape or dtype never enter the pool."""
+    pool = FramePool((4, 6, 3), size=0)
+    pool.release(np.empty((4, 6, 3), dtype=np.float32))
+    pool.release(np.empty((2, 6, 3), dtype=np.uint8))
+    pool.release(np.empty((8, 6, 3), dtype=np.uint8)[:4])
+    
+    frame = pool.acquire()
+    assert frame.shape == (4, 6, 3) and frame.dtype == np.uint8 and frame.base is None
+
+
+def test_video_reader_reuses_released_frames():
+    """Frames handed back with release_frame() are decoded into again."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "test.mp4"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10, (32, 24))
+        if not writer.isOpened():
+            pytest.skip("Cannot create test video")
+        for i in range(6):
+            writer.write(np.full((24, 32, 3), i * 40, dtype=np.uint8))
+        writer.release()
+        
+        buffers = set()
+        with VideoReader(str(path), every_nth=2, pool_size=1) as reader:
+            indices = []
+            for frame_idx, ts_sec, frame in reader.frames():
+                indices.append(frame_idx)
+                buffers.add(id(frame))
+                reader.release_frame(frame)
+        
+        assert indices == [0, 2, 4]
+        assert len(buffers) == 1
+
+
+def _fake_ffmpeg(tmp_path, monkeypatch, script: str):
+    """Put a shell script named ffmpeg first on PATH and select libx264."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake_ffmpeg = bin_dir / "ffmpeg"
+    fake_ffmpeg.write_text(f"#!/bin/sh\n{script}\n")
+    fake_ffmpeg.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(video_reader, "select_encoder", lambda backend: video_reader.ENCODER_LADDER[-1])
+
+
+def test_video_writer_pipes_frames_to_ffmpeg(tmp_path, monkeypatch):
+    """A working encoder gets every frame, odd sizes padded to even."""
+    args_file = tmp_path / "args.txt"
+    _fake_ffmpeg(tmp_path, monkeypatch, f'echo "$@" > {args_file}\nfor a; do out=$a; done\ncat > "$out"')
+    
+    path = tmp_path / "overlay.mp4"
+    with VideoWriter(str(path), 10, (320, 241)) as writer:
+        for i in range(6):
+            writer.write(np.full((241, 320, 3), i, dtype=np.uint8))
+    assert writer._frames_written == 6
+    assert path.stat().st_size == 6 * 241 * 320 * 3
+    assert "pad=ceil(iw/2)*2:ceil(ih/2)*2" in args_file.read_text()
+
+
+@pytest.mark.parametrize("script", [
+    "exit 1",  # fails at startup, e.g. odd size or no hardware encoder
+    "head -c 1000 > /dev/null; exit 1",  # dies after taking part of a frame
+    "cat > /dev/null; exit 1",  # takes every frame, fails on close
+])
+def test_video_writer_falls_back_when_ffmpeg_fails(tmp_path, monkeypatch, script):
+    """Frames ffmpeg never encoded are written by cv2 instead of being lost."""
+    _fake_ffmpeg(tmp_path, monkeypatch, f"echo 'encoder failed' >&2\n{script}")
+    
+    path = tmp_path / "overlay.mp4"
+    with VideoWriter(str(path), 10, (320, 241)) as writer:
+        for i in range(6):
+            writer.write(np.full((241, 320, 3), i * 40, dtype=np.uint8))
+    assert writer._frames_written == 6
+    
+    cap = cv2.VideoCapture(str(path))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 6
+    cap.release()
@@ -66,7 +66,7 @@ def test_video_pipeline_smoke():
             "--in", str(test_video),
             "--out", str(output_dir),
             "--profile", "cpu",
-            "--render", "yes",
+            "--render-overlay", "yes",
             "--every-nth", "2"
         ]
         
@@ -122,11 +122,13 @@ def test_video_pipeline_smoke():
                 lines = f.readlines()
                 assert len(lines) >= 1, "No track data written"
                 
-                # Verify first line is valid JSON
-                first_track = json.loads(lines[0])
-                assert "ts" in first_track
-                assert "frame" in first_track
-                assert "track" in first_track
+                # Verify first line is valid JSON, one record per frame
+                first_frame = json.loads(lines[0])
+                assert "ts" in first_frame
+                assert "frame" in first_frame
+                assert "tracks" in first_frame
+                assert len(first_frame["tracks"]) >= 1
+                assert "id" in first_frame["tracks"][0]
             
             # Check metrics file
             with open(run_dir / "metrics.json", 'r') as f: